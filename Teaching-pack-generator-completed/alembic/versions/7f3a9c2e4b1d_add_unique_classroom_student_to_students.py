@@ -0,0 +1,35 @@
+"""add unique (classroom_id, student_id) to students
+
+Revision ID: 7f3a9c2e4b1d
+Revises: 0c8ff0a450c0
+Create Date: 2026-10-16 09:12:04.118532+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f3a9c2e4b1d'
+down_revision: Union[str, Sequence[str], None] = '0c8ff0a450c0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep the oldest row of any duplicated student before adding the constraint
+    op.execute(
+        "DELETE FROM students WHERE id NOT IN ("
+        "SELECT MIN(id) FROM students GROUP BY classroom_id, student_id)"
+    )
+    with op.batch_alter_table('students') as batch_op:
+        batch_op.create_unique_constraint('uq_students_classroom_student', ['classroom_id', 'student_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('students') as batch_op:
+        batch_op.drop_constraint('uq_students_classroom_student', type_='unique')
@@ -28,6 +28,7 @@ sys.path.insert(0, str(project_root))
 from src.llm.base import AgentClient
 from src.utils.config_loader import load_config, resolve_value, get_config_value
 from src.utils.reproducibility import set_seed
+from src.utils.async_utils import gather_bounded
 from src.data.prompts.teaching_pack_prompts import (
     LESSON_PARSER_PROMPT,
     SKILL_MAPPER_PROMPT,
@@ -551,6 +552,7 @@ async def run_experiment(
     num_students: int = 30,
     pipeline_model: str = "gemini-2.5-flash",
     evaluator_model: str = "gemini-2.5-flash",
+    eval_concurrency: int = 4,
 ):
     """
     Run the complete MAS evaluation experiment
@@ -561,6 +563,7 @@ async def run_experiment(
         output_dir: Directory to save results
         num_groups: Number of student groups
         num_students: Total number of students
+        eval_concurrency: Maximum number of concurrent Gemini evaluation calls
     """
     # Load API key
     gemini_api_key = os.getenv("GEMINI_API_KEY")
@@ -665,11 +668,11 @@ async def run_experiment(
     print("PHASE 2: EVALUATING TEACHING PACKS")
     print("=" * 80)
 
-    evaluations = []
     eval_lesson_summary = gt_lesson_summary or lesson_summary
     eval_skill_set = gt_skill_set or results.get("skill_set")
 
-    for i, teaching_pack in enumerate(teaching_packs_for_eval):
+    # Packs are judged independently, so fan the Gemini calls out.
+    async def _evaluate_pack(i: int, teaching_pack: Dict[str, Any]) -> Dict[str, Any]:
         print(f"\n Evaluating teaching pack {i+1}/{len(teaching_packs_for_eval)}...")
         print(f"   Group: {teaching_pack['group'].group_name}")
 
@@ -680,11 +683,16 @@ async def run_experiment(
             ground_truth=ground_truth
         )
 
-        evaluations.append({
+        return {
             "group_id": teaching_pack["group"].group_id,
             "group_name": teaching_pack["group"].group_name,
             "evaluation": evaluation
-        })
+        }
+
+    evaluations = await gather_bounded(
+        (_evaluate_pack(i, tp) for i, tp in enumerate(teaching_packs_for_eval)),
+        eval_concurrency,
+    )
 
     # Save results
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -747,7 +755,7 @@ async def run_experiment(
 # CLI ENTRY POINT
 # =====================================================
 
-def main():
+def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="Run MAS evaluation experiment with Gemini as judge"
     )
@@ -787,6 +795,12 @@ def main():
         default=None,
         help="Total number of students (default: from config)"
     )
+    parser.add_argument(
+        "--eval_concurrency",
+        type=int,
+        default=None,
+        help="Maximum concurrent Gemini evaluation calls (default: from config)"
+    )
     parser.add_argument(
         "--seed",
         type=int,
@@ -794,12 +808,20 @@ def main():
         help="Random seed (default: from config)"
     )
 
-    args = parser.parse_args()
+    return parser
+
+
+_PARSER = _build_parser()
+
+
+def main():
+    args = _PARSER.parse_args()
 
     config = load_config(args.config)
     num_groups = resolve_value(args.num_groups, config, ["evaluation", "num_groups"], 3)
     num_students = resolve_value(args.num_students, config, ["evaluation", "num_students"], 30)
     output_dir = resolve_value(args.output_dir, config, ["paths", "output_dir"], "results/experiments")
+    eval_concurrency = resolve_value(args.eval_concurrency, config, ["evaluation", "concurrency"], 4)
     seed = resolve_value(args.seed, config, ["seed"], None)
 
     pipeline_model = get_config_value(config, ["models", "mas", "pipeline"], "gemini-2.5-flash")
@@ -816,6 +838,7 @@ def main():
         num_students=num_students,
         pipeline_model=pipeline_model,
         evaluator_model=evaluator_model,
+        eval_concurrency=eval_concurrency,
     ))
 
 
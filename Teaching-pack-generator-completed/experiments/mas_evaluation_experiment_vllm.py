@@ -29,6 +29,7 @@ sys.path.insert(0, str(project_root))
 from src.llm.base import AgentClient
 from src.utils.config_loader import load_config, resolve_value
 from src.utils.reproducibility import set_seed
+from src.utils.async_utils import gather_bounded
 from src.data.prompts.teaching_pack_prompts import (
     LESSON_PARSER_PROMPT,
     SKILL_MAPPER_PROMPT,
@@ -494,8 +495,12 @@ class MASPipeline:
         vllm_model: str,
         vllm_api_key: str | None = None,
         vllm_lora: str | None = None,
+        max_concurrency: int = int(os.getenv("MAS_MAX_CONCURRENCY", "8")),
     ):
         """Initialize all agents"""
+        # Groups are independent; keeping several requests in flight lets
+        # vLLM's continuous batching schedule them together.
+        self.max_concurrency = max_concurrency
         provider = OpenAIProvider(base_url=vllm_base_url, api_key=vllm_api_key)
         extra_body = {"response_format": {"type": "json_object"}}
         if vllm_lora:
@@ -632,27 +637,31 @@ class MASPipeline:
 
         # Stage 5: Label Groups
         print("\n[5/7] Labeling groups with descriptive names...")
-        labeled_groups = []
-        for i, group in enumerate(groups):
-            labeled_group: GroupProfile = await _run_agent_json(
-                self.group_labeler_agent,
-                f"""
+        labeled_groups = await gather_bounded(
+            (
+                _run_agent_json(
+                    self.group_labeler_agent,
+                    f"""
                 Group mastery profile:
                 {json.dumps(group.model_dump(), indent=2)}
 
                 Lesson context:
                 {prompt_lesson_summary.model_dump_json(indent=2)}
                 """,
-                GroupProfile,
-            )
-            labeled_groups.append(labeled_group)
+                    GroupProfile,
+                )
+                for group in groups
+            ),
+            self.max_concurrency,
+        )
+        for i, labeled_group in enumerate(labeled_groups):
             print(f"    Group {i+1}: {labeled_group.group_name} ({labeled_group.mastery_level})")
 
         results["groups"] = labeled_groups
 
         # Stage 6: Generate Teaching Packs for Each Group
         print("\n[6/7] Generating teaching packs for each group...")
-        for i, group in enumerate(labeled_groups):
+        async def _build_pack(i: int, group: GroupProfile) -> Dict[str, Any]:
             print(f"\n   Group {i+1}/{len(labeled_groups)}: {group.group_name}")
 
             # Pack Planning
@@ -735,7 +744,13 @@ class MASPipeline:
                 "video": video,
                 "quiz": quiz
             }
-            results["teaching_packs"].append(teaching_pack)
+            return teaching_pack
+
+        packs = await gather_bounded(
+            (_build_pack(i, group) for i, group in enumerate(labeled_groups)),
+            self.max_concurrency,
+        )
+        results["teaching_packs"].extend(packs)
 
         print("\n[7/7] Pipeline complete!")
         print(f"    Generated {len(results['teaching_packs'])} teaching packs")
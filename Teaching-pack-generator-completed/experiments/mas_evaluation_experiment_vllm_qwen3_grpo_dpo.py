@@ -19,9 +19,14 @@ import sys
 import json
 import asyncio
 import argparse
+import hashlib
+import atexit
+import logging
+import logging.handlers
+import queue
 import re
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Iterator, Optional, TextIO, Tuple
 from pathlib import Path
 
 # Add project root to path
@@ -32,6 +37,7 @@ sys.path.insert(0, str(project_root))
 from src.llm.base import AgentClient
 from src.utils.config_loader import load_config, resolve_value
 from src.utils.reproducibility import set_seed
+from src.utils.async_utils import gather_bounded
 from src.data.prompts.teaching_pack_prompts import (
     LESSON_PARSER_PROMPT,
     SKILL_MAPPER_PROMPT,
@@ -65,6 +71,46 @@ from pydantic_ai.providers.openai import OpenAIProvider
 from pydantic_ai.exceptions import ModelHTTPError
 from pydantic import BaseModel
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Per-group progress from Stage 6, which runs groups concurrently.
+logger = logging.getLogger("mas.pipeline")
+_progress_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def _start_progress_logging() -> None:
+    """Route pipeline progress through a queue so stdout writes happen off the event loop.
+
+    Only installed when nothing upstream handles ``mas.pipeline`` records, so
+    callers importing ``run_experiment`` still see progress on stdout while an
+    application with its own logging config keeps control of it.
+    """
+    global _progress_listener
+    if logger.hasHandlers():
+        return
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    listener.start()
+    _progress_listener = listener
+    # Flush queued records before the interpreter exits
+    atexit.register(listener.stop)
+
+
+def _flush_progress_logging() -> None:
+    """Write out queued progress records before the caller prints to stdout directly."""
+    if _progress_listener is not None:
+        # stop() drains the queue and joins the writer thread
+        _progress_listener.stop()
+        _progress_listener.start()
+
 
 # =====================================================
 # DEFAULTS
@@ -73,6 +119,9 @@ from pydantic import BaseModel
 DEFAULT_VLLM_MODEL = "Qwen/Qwen3-4B"
 DEFAULT_VLLM_LORA = "qwen3-grpo-dpo"
 DEFAULT_GEMINI_MODEL = "gemini-2.0-flash"
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("MAS_MAX_CONCURRENCY", "8"))
+# Kept low to stay under Gemini's per-minute rate limits.
+DEFAULT_EVAL_CONCURRENCY = int(os.getenv("MAS_EVAL_CONCURRENCY", "4"))
 
 
 # =====================================================
@@ -129,14 +178,54 @@ class EvaluationResult(BaseModel):
 # MAS PIPELINE RUNNER
 # =====================================================
 
+def _json_dumps(data: Any) -> str:
+    """Pretty-print JSON for prompts and result files, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(data, indent=2, ensure_ascii=False)
+
+
+def _write_json_streamed(f: TextIO, fields: List[Tuple[str, Any]]) -> None:
+    """Write a JSON object field by field in the same layout as _json_dumps.
+
+    Iterator values are written as arrays one element at a time, so large
+    collections are never serialized into a single string.
+    """
+    f.write("{")
+    for n, (key, value) in enumerate(fields):
+        f.write(f"{',' if n else ''}\n  {_json_dumps(key)}: ")
+        if isinstance(value, Iterator):
+            count = 0
+            for item in value:
+                f.write(f"{',' if count else '['}\n    ")
+                f.write(_json_dumps(item).replace("\n", "\n    "))
+                count += 1
+            f.write("\n  ]" if count else "[]")
+        else:
+            f.write(_json_dumps(value).replace("\n", "\n  "))
+    f.write("\n}")
+
+
+def _as_str(value: Any) -> str:
+    return value if isinstance(value, str) else str(value)
+
+
+def _as_str_list(values: Any) -> List[str]:
+    """Coerce items to strings, reusing the list when it is already all strings."""
+    items = values or []
+    if isinstance(items, list) and all(isinstance(x, str) for x in items):
+        return items
+    return [_as_str(x) for x in items]
+
+
 def _normalize_lesson_summary(raw: Dict[str, Any]) -> LessonSummary:
     """Coerce ground-truth lesson summary into the expected schema."""
     data = dict(raw)
-    data["grade"] = str(data.get("grade", ""))
+    data["grade"] = _as_str(data.get("grade", ""))
     if "key_concepts" in data:
-        data["key_concepts"] = [str(x) for x in (data.get("key_concepts") or [])]
+        data["key_concepts"] = _as_str_list(data.get("key_concepts"))
     if "examples" in data:
-        data["examples"] = [str(x) for x in (data.get("examples") or [])]
+        data["examples"] = _as_str_list(data.get("examples"))
     if "definitions" in data and isinstance(data["definitions"], list):
         defs: Dict[str, str] = {}
         for item in data["definitions"]:
@@ -144,7 +233,7 @@ def _normalize_lesson_summary(raw: Dict[str, Any]) -> LessonSummary:
                 term = item.get("term") or item.get("key") or item.get("name")
                 definition = item.get("definition") or item.get("value") or item.get("desc")
                 if term is not None and definition is not None:
-                    defs[str(term)] = str(definition)
+                    defs[_as_str(term)] = _as_str(definition)
         data["definitions"] = defs
     data.setdefault("lesson_content", "")
     return LessonSummary(**data)
@@ -271,6 +360,37 @@ def _compact_skill_set_for_prompt(skill_set: SkillSet) -> Dict[str, Any]:
     }
 
 
+def _compact_slides_for_eval(slides: Slides) -> List[Dict[str, Any]]:
+    """Keep only the slide fields the judge scores for accuracy."""
+    return [
+        {"slide_id": s.slide_id, "title": s.title, "content": s.content}
+        for s in slides.slides
+    ]
+
+
+def _compact_quiz_for_eval(quiz: Quiz) -> List[Dict[str, Any]]:
+    """Drop answer_key/timing metadata; questions carry everything judged."""
+    return [q.model_dump() for q in quiz.questions]
+
+
+_DEFAULT_SLIDE_OUTLINE: Tuple[Dict[str, str], ...] = (
+    {"title": "Overview", "key_points": "Key ideas and objectives"},
+)
+
+
+def _default_quiz_blueprint(skill_id: str) -> List[Dict[str, str]]:
+    return [{"skill_id": skill_id, "difficulty": "medium"}]
+
+
+def _slide_outline_from_concepts(lesson_summary: LessonSummary) -> List[Dict[str, str]]:
+    """Outline one slide per key concept, or a single overview slide."""
+    slide_outline = [
+        {"title": str(concept), "key_points": str(concept)}
+        for concept in (lesson_summary.key_concepts or [])[:6]
+    ]
+    return slide_outline or [dict(item) for item in _DEFAULT_SLIDE_OUTLINE]
+
+
 def _fallback_pack_plan(
     lesson_summary: LessonSummary,
     skill_set: SkillSet,
@@ -278,18 +398,13 @@ def _fallback_pack_plan(
 ) -> PackPlan:
     """Create a minimal valid pack plan if the model output is unusable."""
     objectives = (lesson_summary.key_concepts or [])[:3]
-    slide_outline = [
-        {"title": str(concept), "key_points": str(concept)}
-        for concept in (lesson_summary.key_concepts or [])[:6]
-    ]
-    if not slide_outline:
-        slide_outline = [{"title": "Overview", "key_points": "Key ideas and objectives"}]
+    slide_outline = _slide_outline_from_concepts(lesson_summary)
 
     quiz_blueprint = []
     for skill in (skill_set.skills or [])[:3]:
         quiz_blueprint.append({"skill_id": skill.skill_id, "difficulty": "medium"})
     if not quiz_blueprint:
-        quiz_blueprint = [{"skill_id": "", "difficulty": "medium"}]
+        quiz_blueprint = _default_quiz_blueprint("")
 
     return PackPlan(
         group_id=group.group_id,
@@ -388,18 +503,58 @@ def _extract_max_tokens_limit(err: Exception) -> int | None:
     return None
 
 
+# Canonical difficulty strings, so normalized questions share one object per level.
+_DIFFICULTY_LEVELS = {level: sys.intern(level) for level in ("easy", "medium", "hard")}
+
+
+def _normalize_difficulty(value: Any) -> str:
+    if value is None:
+        return _DIFFICULTY_LEVELS["medium"]
+    return _DIFFICULTY_LEVELS.get(str(value).lower(), _DIFFICULTY_LEVELS["medium"])
+
+
+# Fallback fields merged into loosely-shaped model output before validation.
+# Validation copies containers, so sharing these literals across calls is safe.
+_PARSE_DEFAULTS: Dict[Any, Dict[str, Any]] = {
+    LessonSummary: {"grade": "", "lesson_content": ""},
+    SkillSet: {"skill_dependencies": {}},
+    Diagnostic: {"questions": [], "skills_covered": []},
+    GroupProfile: {"group_id": "", "skill_mastery": {}, "students": []},
+    PackPlan: {
+        "group_id": "",
+        "learning_objectives": [],
+        "differentiation_strategy": "",
+        "slide_outline": [],
+    },
+    Slides: {"slides": []},
+    Quiz: {"questions": [], "practice_exercises": [], "answer_key": {}},
+}
+
+
 def _parse_model_from_text(text: str, model_cls: Any) -> Any:
+    stripped = text.strip()
+    # Bare JSON objects (the usual case with response_format=json_object) try
+    # validation first; anything that fails, e.g. "{...}\nNote: {...}", falls
+    # through to fence stripping and block extraction.
+    if stripped.startswith("{") and stripped.endswith("}"):
+        try:
+            return model_cls.model_validate_json(stripped)
+        except Exception:
+            pass
+    del stripped
     cleaned = _strip_code_fence(text)
     json_text = _extract_json_block(cleaned) if "{" in cleaned else cleaned
+    del cleaned
     try:
+        # BaseModel classes carry a compiled __pydantic_validator__, so this is
+        # already the TypeAdapter fast path; wrapping them adds nothing.
         return model_cls.model_validate_json(json_text)
     except Exception:
         data = json.loads(json_text)
+        # Long completions: drop the raw JSON before building normalized copies.
+        del json_text
         if isinstance(data, dict):
-            if model_cls is LessonSummary:
-                data.setdefault("grade", "")
-                data.setdefault("lesson_content", "")
-            elif model_cls is SkillSet:
+            if model_cls is SkillSet:
                 skills = data.get("skills")
                 if isinstance(skills, list):
                     normalized = []
@@ -423,7 +578,6 @@ def _parse_model_from_text(text: str, model_cls: Any) -> Any:
                             fixed["weight"] = 0.7
                         normalized.append(fixed)
                     data["skills"] = normalized
-                data.setdefault("skill_dependencies", {})
             elif model_cls is Diagnostic:
                 if "diagnostic" in data and isinstance(data["diagnostic"], dict):
                     inner = data.pop("diagnostic")
@@ -450,11 +604,7 @@ def _parse_model_from_text(text: str, model_cls: Any) -> Any:
                             fixed_q["options"] = fixed_q.get("choices") or []
                         if not isinstance(fixed_q.get("options"), list):
                             fixed_q["options"] = [str(fixed_q["options"])]
-                        diff = fixed_q.get("difficulty")
-                        diff_norm = str(diff).lower() if diff is not None else "medium"
-                        if diff_norm not in ("easy", "medium", "hard"):
-                            diff_norm = "medium"
-                        fixed_q["difficulty"] = diff_norm
+                        fixed_q["difficulty"] = _normalize_difficulty(fixed_q.get("difficulty"))
                         if fixed_q.get("question_text") is None:
                             fixed_q["question_text"] = ""
                         if fixed_q.get("correct_answer") is None:
@@ -467,27 +617,17 @@ def _parse_model_from_text(text: str, model_cls: Any) -> Any:
                             fixed_q["rationale"] = ""
                         normalized_qs.append(fixed_q)
                     data["questions"] = normalized_qs
-                data.setdefault("questions", [])
-                data.setdefault("skills_covered", [])
-                data.setdefault("total_questions", len(data.get("questions", [])))
             elif model_cls is GroupProfile:
-                data.setdefault("group_id", "")
-                data.setdefault("mastery_level", "medium")
                 if data.get("mastery_level") not in {"low", "medium", "high", "advanced"}:
                     data["mastery_level"] = "medium"
-                data.setdefault("skill_mastery", {})
-                data.setdefault("learning_pace", "moderate")
                 if data.get("learning_pace") not in {"slow", "moderate", "fast"}:
                     data["learning_pace"] = "moderate"
-                data.setdefault("students", [])
             elif model_cls is PackPlan:
                 if "teaching_pack" in data and isinstance(data["teaching_pack"], dict):
                     inner = data.pop("teaching_pack")
                     for key in ("learning_objectives", "slide_outline", "quiz_blueprint", "estimated_time", "differentiation_strategy", "group_id"):
                         if key not in data and key in inner:
                             data[key] = inner[key]
-                data.setdefault("group_id", "")
-                data.setdefault("learning_objectives", [])
                 estimated_time = data.get("estimated_time")
                 if isinstance(estimated_time, dict):
                     data["estimated_time"] = sum(
@@ -497,8 +637,7 @@ def _parse_model_from_text(text: str, model_cls: Any) -> Any:
                     estimated_str = str(estimated_time)
                     digits = "".join(ch for ch in estimated_str if ch.isdigit())
                     data["estimated_time"] = int(digits) if digits else 0
-                data.setdefault("differentiation_strategy", "")
-                diff_strategy = data.get("differentiation_strategy")
+                diff_strategy = data.get("differentiation_strategy", "")
                 if not isinstance(diff_strategy, str):
                     data["differentiation_strategy"] = json.dumps(
                         diff_strategy, ensure_ascii=False
@@ -521,7 +660,6 @@ def _parse_model_from_text(text: str, model_cls: Any) -> Any:
                             fixed_item["key_points"] = ""
                         normalized_outline.append(fixed_item)
                     data["slide_outline"] = normalized_outline
-                data.setdefault("slide_outline", [])
                 quiz_blueprint = data.get("quiz_blueprint")
                 if isinstance(quiz_blueprint, dict):
                     data["quiz_blueprint"] = [quiz_blueprint]
@@ -575,7 +713,6 @@ def _parse_model_from_text(text: str, model_cls: Any) -> Any:
                             fixed_slide["speaker_notes"] = fixed_slide.get("notes") or ""
                         normalized_slides.append(fixed_slide)
                     data["slides"] = normalized_slides
-                data.setdefault("slides", [])
             elif model_cls is Quiz:
                 questions = data.get("questions")
                 if isinstance(questions, list):
@@ -590,11 +727,7 @@ def _parse_model_from_text(text: str, model_cls: Any) -> Any:
                             fixed_q["question_text"] = fixed_q.get("question") or fixed_q.get("prompt") or ""
                         if "correct_answer" not in fixed_q:
                             fixed_q["correct_answer"] = fixed_q.get("answer") or fixed_q.get("correct") or ""
-                        diff = fixed_q.get("difficulty")
-                        diff_norm = str(diff).lower() if diff is not None else "medium"
-                        if diff_norm not in ("easy", "medium", "hard"):
-                            diff_norm = "medium"
-                        fixed_q["difficulty"] = diff_norm
+                        fixed_q["difficulty"] = _normalize_difficulty(fixed_q.get("difficulty"))
                         if "skill_id" not in fixed_q:
                             fixed_q["skill_id"] = ""
                         if "hint" not in fixed_q:
@@ -603,7 +736,6 @@ def _parse_model_from_text(text: str, model_cls: Any) -> Any:
                             fixed_q["explanation"] = ""
                         normalized_qs.append(fixed_q)
                     data["questions"] = normalized_qs
-                data.setdefault("questions", [])
                 practice_exercises = data.get("practice_exercises")
                 if isinstance(practice_exercises, list):
                     normalized_ex = []
@@ -611,19 +743,106 @@ def _parse_model_from_text(text: str, model_cls: Any) -> Any:
                         if not isinstance(ex, dict):
                             continue
                         fixed_ex = dict(ex)
-                        diff = fixed_ex.get("difficulty")
-                        diff_norm = str(diff).lower() if diff is not None else "medium"
-                        if diff_norm not in ("easy", "medium", "hard"):
-                            diff_norm = "medium"
-                        fixed_ex["difficulty"] = diff_norm
+                        fixed_ex["difficulty"] = _normalize_difficulty(fixed_ex.get("difficulty"))
                         normalized_ex.append(fixed_ex)
                     data["practice_exercises"] = normalized_ex
-                data.setdefault("practice_exercises", [])
-                data.setdefault("answer_key", {})
-                data.setdefault("total_questions", len(data.get("questions", [])))
+            defaults = _PARSE_DEFAULTS.get(model_cls)
+            if defaults:
+                data = {**defaults, **data}
+            if model_cls is Diagnostic or model_cls is Quiz:
+                data.setdefault("total_questions", len(data["questions"]))
         return model_cls.model_validate(data)
 
 
+class AgentResponseCache:
+    """Exact-match cache of validated agent responses keyed by prompt hash.
+
+    Entries always live in memory for the current run; when ``cache_dir`` is
+    set they are also persisted as JSON blobs so re-runs skip the LLM call.
+    """
+
+    def __init__(self, cache_dir: str | None = None, namespace: str = ""):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.namespace = namespace
+        self._entries: Dict[str, str] = {}
+
+    def key(self, agent_name: str, prompt: str, model_cls: Any, max_tokens: Any) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        for part in (self.namespace, agent_name, model_cls.__name__, str(max_tokens), prompt):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return f"{agent_name}/{digest.hexdigest()}"
+
+    def get(self, key: str, model_cls: Any) -> Any:
+        payload = self._entries.get(key)
+        if payload is None and self.cache_dir is not None:
+            path = self.cache_dir / f"{key}.json"
+            if path.is_file():
+                payload = path.read_text(encoding="utf-8")
+                self._entries[key] = payload
+        if payload is None:
+            return None
+        # Validate a fresh copy per hit; callers mutate the returned models.
+        return model_cls.model_validate_json(payload)
+
+    def put(self, key: str, value: BaseModel) -> None:
+        payload = value.model_dump_json()
+        self._entries[key] = payload
+        if self.cache_dir is not None:
+            path = self.cache_dir / f"{key}.json"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(payload, encoding="utf-8")
+
+
+def _estimate_max_tokens(model_cls: Any, item_count: int, tokens_per_item: int = 30) -> int:
+    """Size the first-try completion budget from the schema and expected list length.
+
+    Starting high enough avoids the truncated-JSON retry round trip; max_tokens
+    is only a cap, so short answers cost nothing extra.
+    """
+    return min(1024, 160 + len(model_cls.model_fields) * 40 + item_count * tokens_per_item)
+
+
+# Fixed prompt tails, kept byte-identical across groups.
+_PACK_PLAN_CONSTRAINTS = (
+    "\n\nConstraints:"
+    "\n- slide_outline must have 6-8 items, each with title and key_points."
+    "\n- quiz_blueprint must have at least 3 items."
+    "\n- Keep all text short (<=10 words each)."
+    "\nReturn ONLY JSON matching the PackPlan schema."
+)
+
+_QUIZ_CONSTRAINTS = (
+    "\n\nConstraints:"
+    "\n- exactly 5 questions"
+    "\n- each question has 4 options"
+    "\n- practice_exercises must be []"
+    "\n- answer_key must be {}"
+    "\n- total_questions must be 5"
+    "\n- estimated_time must be an integer (minutes)"
+    "\n- keep explanations short (<=10 words)"
+    "\nReturn ONLY JSON matching the Quiz schema."
+)
+
+_SLIDES_CONSTRAINTS = (
+    "\n\nConstraints:"
+    "\n- number of slides must match slide_outline count"
+    "\n- keep each title/content short (<=12 words)"
+    "\n- visual_notes and speaker_notes can be empty"
+    "\nReturn ONLY JSON matching the Slides schema."
+)
+
+_MINIMAL_JSON_SUFFIX = (
+    "\n\nIMPORTANT: Return MINIMAL JSON only. "
+    "Keep each field short and avoid extra text."
+)
+
+_JSON_ONLY_SUFFIX = (
+    "\n\nReturn ONLY a valid JSON object that strictly matches the required schema. "
+    "Do not include any extra text."
+)
+
+
 async def _run_agent_json(
     agent: Any,
     prompt: str,
@@ -679,11 +898,8 @@ async def _run_agent_json(
                 json_adjusts += 1
                 continue
             parse_attempts += 1
-            prompt = (
-                prompt
-                + "\n\nReturn ONLY a valid JSON object that strictly matches the required schema. "
-                + "Do not include any extra text."
-            )
+            if not prompt.endswith(_JSON_ONLY_SUFFIX):
+                prompt = prompt + _JSON_ONLY_SUFFIX
     raise ValueError(f"Failed to parse model output as {model_cls.__name__}: {last_err}")
 
 class MASPipeline:
@@ -695,8 +911,17 @@ class MASPipeline:
         vllm_model: str,
         vllm_api_key: str | None = None,
         vllm_lora: str | None = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        agent_cache_dir: str | None = None,
     ):
         """Initialize all agents"""
+        self.max_concurrency = max_concurrency
+        # Number of times a first-try budget still truncated and the lite
+        # prompt retry ran; a non-zero count means the estimates are too low.
+        self.truncation_retries = 0
+        self.response_cache = AgentResponseCache(
+            agent_cache_dir, namespace=f"{vllm_model}|{vllm_lora or ''}"
+        )
         provider = OpenAIProvider(base_url=vllm_base_url, api_key=vllm_api_key)
         extra_body = {"response_format": {"type": "json_object"}}
         if vllm_lora:
@@ -759,6 +984,17 @@ class MASPipeline:
             model=self.model
         ).create_agent()
 
+    async def _run_cached(self, agent_name: str, prompt: str, model_cls: Any, **kwargs: Any) -> Any:
+        """Run ``<agent_name>_agent`` through _run_agent_json, reusing identical prompts."""
+        key = self.response_cache.key(agent_name, prompt, model_cls, kwargs.get("max_tokens"))
+        cached = self.response_cache.get(key, model_cls)
+        if cached is not None:
+            return cached
+        agent = getattr(self, f"{agent_name}_agent")
+        parsed = await _run_agent_json(agent, prompt, model_cls, **kwargs)
+        self.response_cache.put(key, parsed)
+        return parsed
+
     async def run_pipeline(
         self,
         lesson_summary: LessonSummary,
@@ -776,9 +1012,9 @@ class MASPipeline:
         Returns:
             Dictionary containing teaching packs for all groups
         """
-        print("=" * 80)
-        print("STARTING MAS PIPELINE")
-        print("=" * 80)
+        logger.info("=" * 80)
+        logger.info("STARTING MAS PIPELINE")
+        logger.info("=" * 80)
 
         results = {
             "lesson_summary": lesson_summary,
@@ -788,22 +1024,24 @@ class MASPipeline:
             "teaching_packs": []
         }
         prompt_lesson_summary = _compact_lesson_summary(lesson_summary)
+        # Serialized once; every stage embeds the same compact summary.
+        lesson_summary_json = prompt_lesson_summary.model_dump_json(indent=2)
 
         # Stage 1: Skill Mapping
-        print("\n[1/7] Mapping skills from lesson summary...")
-        skill_set: SkillSet = await _run_agent_json(
-            self.skill_mapper_agent,
-            prompt_lesson_summary.model_dump_json(indent=2)
+        logger.info("\n[1/7] Mapping skills from lesson summary...")
+        skill_set: SkillSet = await self._run_cached(
+            "skill_mapper",
+            lesson_summary_json
             + "\n\nReturn ONLY JSON matching the SkillSet schema.",
             SkillSet,
         )
         results["skill_set"] = skill_set
-        print(f"    Identified {len(skill_set.skills)} skills")
+        logger.info("    Identified %s skills", len(skill_set.skills))
 
         # Stage 2: Diagnostic Building
-        print("\n[2/7] Building diagnostic assessment...")
-        diagnostic: Diagnostic = await _run_agent_json(
-            self.diagnostic_builder_agent,
+        logger.info("\n[2/7] Building diagnostic assessment...")
+        diagnostic: Diagnostic = await self._run_cached(
+            "diagnostic_builder",
             skill_set.model_dump_json(indent=2)
             + "\n\nKeep it concise: exactly 5 questions. Short options and rationale (<=10 words)."
             + "\nReturn ONLY JSON matching the Diagnostic schema.",
@@ -811,288 +1049,280 @@ class MASPipeline:
             max_tokens=900,
         )
         results["diagnostic"] = diagnostic
-        print(f"    Created diagnostic with {len(diagnostic.questions)} questions")
+        logger.info("    Created diagnostic with %s questions", len(diagnostic.questions))
 
         # Stage 3: Generate Mock Student Results
-        print(f"\n[3/7] Generating mock results for {num_students} students...")
+        logger.info("\n[3/7] Generating mock results for %s students...", num_students)
         student_list = [f"Student_{i+1}" for i in range(num_students)]
         mock_results = generate_mock_diagnostic_results(
             student_list=student_list,
             diagnostic=diagnostic,
             skill_set=skill_set
         )
-        print(f"    Generated {len(mock_results)} student results")
+        logger.info("    Generated %s student results", len(mock_results))
 
         # Stage 4: Group Students by Quartile
-        print(f"\n[4/7] Grouping students into {num_groups} groups...")
+        logger.info("\n[4/7] Grouping students into %s groups...", num_groups)
         groups_result = profile_groups_by_quartile(
             skill_set=skill_set,
             diagnostic_results=mock_results,
             num_groups=num_groups
         )
         groups = groups_result.groups
-        print(f"    Created {len(groups)} groups")
+        logger.info("    Created %s groups", len(groups))
 
         # Stage 5: Label Groups
-        print("\n[5/7] Labeling groups with descriptive names...")
-        used_group_names: set[str] = set()
-        labeled_groups = []
-        for i, group in enumerate(groups):
-            labeled_group: GroupProfile = await _run_agent_json(
-                self.group_labeler_agent,
-                f"""
-                Group mastery profile:
-                {json.dumps(group.model_dump(), indent=2)}
-
+        logger.info("\n[5/7] Labeling groups with descriptive names...")
+        label_results: List[GroupProfile] = await gather_bounded(
+            (
+                self._run_cached(
+                    "group_labeler",
+                    f"""
                 Lesson context:
-                {prompt_lesson_summary.model_dump_json(indent=2)}
+                {lesson_summary_json}
+
+                Group mastery profile:
+                {_json_dumps(group.model_dump())}
                 """,
-                GroupProfile,
-            )
+                    GroupProfile,
+                )
+                for group in groups
+            ),
+            self.max_concurrency,
+        )
+        used_group_names: set[str] = set()
+        # Last suffix handed out per base name, so repeated collisions resume
+        # from there instead of rescanning "Name 2", "Name 3", ...
+        name_counts: Dict[str, int] = {}
+        labeled_groups = []
+        for i, labeled_group in enumerate(label_results):
             raw_name = (labeled_group.group_name or "").strip()
             if not raw_name:
                 raw_name = f"Group {i+1}"
-            name = raw_name
-            suffix = 1
+            key = raw_name.lower()
+            suffix = name_counts.get(key, 0)
+            name = raw_name if suffix == 0 else f"{raw_name} {suffix + 1}"
+            # Only loops when a labeler literally returned e.g. "Name 2".
             while name.lower() in used_group_names:
                 suffix += 1
-                name = f"{raw_name} {suffix}"
+                name = f"{raw_name} {suffix + 1}"
+            name_counts[key] = suffix + 1
             labeled_group.group_name = name
             used_group_names.add(name.lower())
             labeled_groups.append(labeled_group)
-            print(f"    Group {i+1}: {labeled_group.group_name} ({labeled_group.mastery_level})")
+            logger.info("    Group %s: %s (%s)", i+1, labeled_group.group_name, labeled_group.mastery_level)
 
         results["groups"] = labeled_groups
 
         # Stage 6: Generate Teaching Packs for Each Group
-        print("\n[6/7] Generating teaching packs for each group...")
-        for i, group in enumerate(labeled_groups):
-            print(f"\n   Group {i+1}/{len(labeled_groups)}: {group.group_name}")
-
-            # Pack Planning
-            print("      ... Planning pack...")
-            compact_skill_set = _compact_skill_set_for_prompt(skill_set)
-            group_context = json.dumps(
-                {
-                    "group_id": group.group_id,
-                    "mastery_level": group.mastery_level,
-                    "learning_pace": group.learning_pace,
-                },
-                indent=2,
-                ensure_ascii=False,
-            )
-            pack_plan_prompt = f"""
+        logger.info("\n[6/7] Generating teaching packs for each group...")
+        # Prompts lead with the lesson/skill context shared by every group so
+        # vLLM's automatic prefix cache can reuse it; group-specific parts and
+        # constraints come last.
+        compact_skill_set = _compact_skill_set_for_prompt(skill_set)
+        quiz_lesson_context = _json_dumps(_compact_lesson_summary_for_quiz(lesson_summary))
+        pack_plan_prefix = f"""
                 Lesson Summary (compact):
-                {prompt_lesson_summary.model_dump_json(indent=2)}
+                {lesson_summary_json}
 
                 Skill Set (compact):
-                {json.dumps(compact_skill_set, indent=2, ensure_ascii=False)}
+                {_json_dumps(compact_skill_set)}
+                """.strip()
+
+        # Pack plans and slides are driven by (mastery_level, learning_pace), so
+        # groups with the same profile share one in-flight task per stage and
+        # take deep copies. Quiz and video keep per-group variation.
+        plan_tasks: Dict[Tuple[str, str], "asyncio.Future[PackPlan]"] = {}
+        slide_tasks: Dict[Tuple[str, str], "asyncio.Future[Slides]"] = {}
+
+        async def _plan_pack(group: GroupProfile, group_context: str) -> PackPlan:
+            # Pack Planning
+            logger.info("      ... Planning pack...")
+            pack_plan_prompt = f"""{pack_plan_prefix}
 
                 Group Profile (compact):
                 {group_context}
                 """.strip()
-            pack_plan_prompt += (
-                "\n\nConstraints:"
-                "\n- slide_outline must have 6-8 items, each with title and key_points."
-                "\n- quiz_blueprint must have at least 3 items."
-                "\n- Keep all text short (<=10 words each)."
-                "\nReturn ONLY JSON matching the PackPlan schema."
-            )
+            pack_plan_prompt += _PACK_PLAN_CONSTRAINTS
             pack_plan: PackPlan
             try:
-                pack_plan = await _run_agent_json(
-                    self.pack_planner_agent,
+                pack_plan = await self._run_cached(
+                    "pack_planner",
                     pack_plan_prompt,
                     PackPlan,
-                    max_tokens=480,
+                    # Up to 8 outline items (the quiz blueprint is much shorter).
+                    max_tokens=_estimate_max_tokens(PackPlan, 8),
                 )
             except ValueError as err:
                 if "Unclosed JSON object" in str(err):
+                    self.truncation_retries += 1
                     try:
-                        lite_prompt = (
-                            pack_plan_prompt
-                            + "\n\nIMPORTANT: Return MINIMAL JSON only. "
-                            + "Keep each field short and avoid extra text."
-                        )
-                        pack_plan = await _run_agent_json(
-                            self.pack_planner_agent,
+                        lite_prompt = pack_plan_prompt + _MINIMAL_JSON_SUFFIX
+                        pack_plan = await self._run_cached(
+                            "pack_planner",
                             lite_prompt,
                             PackPlan,
                             retries=1,
                             max_tokens=320,
                         )
                     except Exception as inner_err:
-                        print(f"[WARN] PackPlan JSON truncated. Using fallback. {inner_err}")
+                        logger.warning("[WARN] PackPlan JSON truncated. Using fallback. %s", inner_err)
                         pack_plan = _fallback_pack_plan(lesson_summary, skill_set, group)
                 else:
-                    print(f"[WARN] PackPlan parse failed. Using fallback. {err}")
+                    logger.warning("[WARN] PackPlan parse failed. Using fallback. %s", err)
                     pack_plan = _fallback_pack_plan(lesson_summary, skill_set, group)
             except Exception as err:
-                print(f"[WARN] PackPlan generation failed. Using fallback. {err}")
+                logger.warning("[WARN] PackPlan generation failed. Using fallback. %s", err)
                 pack_plan = _fallback_pack_plan(lesson_summary, skill_set, group)
             if not pack_plan.slide_outline:
-                fallback = []
-                for concept in (lesson_summary.key_concepts or [])[:6]:
-                    fallback.append({"title": str(concept), "key_points": str(concept)})
-                if not fallback:
-                    fallback = [{"title": "Overview", "key_points": "Key ideas and objectives"}]
-                pack_plan.slide_outline = fallback
+                pack_plan.slide_outline = _slide_outline_from_concepts(lesson_summary)
             if not pack_plan.quiz_blueprint:
                 first_skill = skill_set.skills[0].skill_id if skill_set.skills else ""
-                pack_plan.quiz_blueprint = [{"skill_id": first_skill, "difficulty": "medium"}]
-            print(f"         ... Created plan with {len(pack_plan.slide_outline)} slides")
-            # Quiz Generation
-            print("      ... Generating quiz...")
-            compact_plan = _compact_pack_plan_for_quiz(pack_plan)
-            lesson_context = json.dumps(
-                _compact_lesson_summary_for_quiz(lesson_summary),
-                indent=2,
-                ensure_ascii=False,
-            )
-            group_context = json.dumps(
+                pack_plan.quiz_blueprint = _default_quiz_blueprint(first_skill)
+            return pack_plan
+
+        async def _build_pack(i: int, group: GroupProfile) -> Dict[str, Any]:
+            logger.info("\n   Group %s/%s: %s", i+1, len(labeled_groups), group.group_name)
+            # Shared by the pack plan, quiz and slide prompts.
+            group_context = _json_dumps(
                 {
                     "group_id": group.group_id,
                     "mastery_level": group.mastery_level,
                     "learning_pace": group.learning_pace,
-                },
-                indent=2,
-                ensure_ascii=False,
+                }
             )
-            quiz_prompt = f"""
+
+            # Groups sharing a profile reuse one plan; only group_id differs.
+            profile_key = (group.mastery_level, group.learning_pace)
+            plan_task = plan_tasks.get(profile_key)
+            if plan_task is None:
+                plan_task = asyncio.ensure_future(_plan_pack(group, group_context))
+                plan_tasks[profile_key] = plan_task
+            else:
+                logger.info("      ... Reusing pack plan from a group with the same profile")
+            pack_plan = (await plan_task).model_copy(deep=True)
+            pack_plan.group_id = group.group_id
+            logger.info("         ... Created plan with %s slides", len(pack_plan.slide_outline))
+            quiz_plan_json = _json_dumps(_compact_pack_plan_for_quiz(pack_plan))
+            slides_plan_json = _json_dumps(_compact_pack_plan_for_slides(pack_plan))
+
+            # Quiz and slides depend only on the pack plan, so draft them together.
+            async def _gen_quiz() -> Quiz:
+                logger.info("      ... Generating quiz...")
+                quiz_prompt = f"""
                 Lesson Summary (compact):
-                {lesson_context}
+                {quiz_lesson_context}
 
                 Pack Plan (compact):
-                {json.dumps(compact_plan, indent=2, ensure_ascii=False)}
+                {quiz_plan_json}
 
                 Group Profile (compact):
                 {group_context}
                 """.strip()
-            quiz_prompt += (
-                "\n\nConstraints:"
-                "\n- exactly 5 questions"
-                "\n- each question has 4 options"
-                "\n- practice_exercises must be []"
-                "\n- answer_key must be {}"
-                "\n- total_questions must be 5"
-                "\n- estimated_time must be an integer (minutes)"
-                "\n- keep explanations short (<=10 words)"
-                "\nReturn ONLY JSON matching the Quiz schema."
-            )
-            quiz: Quiz
-            try:
-                quiz = await _run_agent_json(
-                    self.quiz_practice_agent,
-                    quiz_prompt,
-                    Quiz,
-                    max_tokens=480,
-                )
-            except ValueError as err:
-                if "Unclosed JSON object" in str(err):
-                    try:
-                        lite_prompt = (
-                            quiz_prompt
-                            + "\n\nIMPORTANT: Return MINIMAL JSON only. "
-                            + "Keep each field short and avoid extra text."
-                        )
-                        quiz = await _run_agent_json(
-                            self.quiz_practice_agent,
-                            lite_prompt,
-                            Quiz,
-                            retries=1,
-                            max_tokens=320,
-                        )
-                    except Exception as inner_err:
-                        print(f"[WARN] Quiz JSON truncated. Using fallback. {inner_err}")
+                quiz_prompt += _QUIZ_CONSTRAINTS
+                quiz: Quiz
+                try:
+                    quiz = await self._run_cached(
+                        "quiz_practice",
+                        quiz_prompt,
+                        Quiz,
+                        max_tokens=_estimate_max_tokens(Quiz, 5, tokens_per_item=60),
+                    )
+                except ValueError as err:
+                    if "Unclosed JSON object" in str(err):
+                        self.truncation_retries += 1
+                        try:
+                            lite_prompt = quiz_prompt + _MINIMAL_JSON_SUFFIX
+                            quiz = await self._run_cached(
+                                "quiz_practice",
+                                lite_prompt,
+                                Quiz,
+                                retries=1,
+                                max_tokens=320,
+                            )
+                        except Exception as inner_err:
+                            logger.warning("[WARN] Quiz JSON truncated. Using fallback. %s", inner_err)
+                            quiz = _fallback_quiz_from_plan(pack_plan, skill_set)
+                    else:
+                        logger.warning("[WARN] Quiz parse failed. Using fallback. %s", err)
                         quiz = _fallback_quiz_from_plan(pack_plan, skill_set)
-                else:
-                    print(f"[WARN] Quiz parse failed. Using fallback. {err}")
+                except Exception as err:
+                    logger.warning("[WARN] Quiz generation failed. Using fallback. %s", err)
                     quiz = _fallback_quiz_from_plan(pack_plan, skill_set)
-            except Exception as err:
-                print(f"[WARN] Quiz generation failed. Using fallback. {err}")
-                quiz = _fallback_quiz_from_plan(pack_plan, skill_set)
-            print(f"         ... Generated {len(quiz.questions)} questions")
-
-            # Slide Drafting
-            print("       Drafting slides...")
-            compact_plan = _compact_pack_plan_for_slides(pack_plan)
-            group_context = json.dumps(
-                {
-                    "group_id": group.group_id,
-                    "mastery_level": group.mastery_level,
-                    "learning_pace": group.learning_pace,
-                },
-                indent=2,
-                ensure_ascii=False,
-            )
-            slide_prompt = f"""
+                logger.info("         ... Generated %s questions", len(quiz.questions))
+                return quiz
+
+            async def _gen_slides() -> Slides:
+                logger.info("       Drafting slides...")
+                slide_prompt = f"""
                 Lesson Summary (compact):
-                {prompt_lesson_summary.model_dump_json(indent=2)}
+                {lesson_summary_json}
 
                 Pack Plan (compact):
-                {json.dumps(compact_plan, indent=2, ensure_ascii=False)}
+                {slides_plan_json}
 
                 Group Profile (compact):
                 {group_context}
                 """.strip()
-            slide_prompt += (
-                "\n\nConstraints:"
-                "\n- number of slides must match slide_outline count"
-                "\n- keep each title/content short (<=12 words)"
-                "\n- visual_notes and speaker_notes can be empty"
-                "\nReturn ONLY JSON matching the Slides schema."
-            )
-            slides: Slides
-            try:
-                slides = await _run_agent_json(
-                    self.slide_drafter_agent,
-                    slide_prompt,
-                    Slides,
-                    max_tokens=480,
-                )
-            except ValueError as err:
-                if "Unclosed JSON object" in str(err):
-                    try:
-                        lite_prompt = (
-                            slide_prompt
-                            + "\n\nIMPORTANT: Return MINIMAL JSON only. "
-                            + "Keep each field short and avoid extra text."
-                        )
-                        slides = await _run_agent_json(
-                            self.slide_drafter_agent,
-                            lite_prompt,
-                            Slides,
-                            retries=1,
-                            max_tokens=320,
-                        )
-                    except Exception as inner_err:
-                        print(f"[WARN] Slides JSON truncated. Using fallback. {inner_err}")
+                slide_prompt += _SLIDES_CONSTRAINTS
+                slides: Slides
+                try:
+                    slides = await self._run_cached(
+                        "slide_drafter",
+                        slide_prompt,
+                        Slides,
+                        max_tokens=_estimate_max_tokens(
+                            Slides, len(pack_plan.slide_outline), tokens_per_item=50
+                        ),
+                    )
+                except ValueError as err:
+                    if "Unclosed JSON object" in str(err):
+                        self.truncation_retries += 1
+                        try:
+                            lite_prompt = slide_prompt + _MINIMAL_JSON_SUFFIX
+                            slides = await self._run_cached(
+                                "slide_drafter",
+                                lite_prompt,
+                                Slides,
+                                retries=1,
+                                max_tokens=320,
+                            )
+                        except Exception as inner_err:
+                            logger.warning("[WARN] Slides JSON truncated. Using fallback. %s", inner_err)
+                            slides = _fallback_slides_from_plan(pack_plan)
+                    else:
+                        logger.warning("[WARN] Slides parse failed. Using fallback. %s", err)
                         slides = _fallback_slides_from_plan(pack_plan)
-                else:
-                    print(f"[WARN] Slides parse failed. Using fallback. {err}")
+                except Exception as err:
+                    logger.warning("[WARN] Slides generation failed. Using fallback. %s", err)
                     slides = _fallback_slides_from_plan(pack_plan)
-            except Exception as err:
-                print(f"[WARN] Slides generation failed. Using fallback. {err}")
-                slides = _fallback_slides_from_plan(pack_plan)
-            print(f"          Drafted {len(slides.slides)} slides")
+                logger.info("          Drafted %s slides", len(slides.slides))
+                return slides
+
+            slides_task = slide_tasks.get(profile_key)
+            if slides_task is None:
+                slides_task = asyncio.ensure_future(_gen_slides())
+                slide_tasks[profile_key] = slides_task
+            quiz, slides = await asyncio.gather(_gen_quiz(), slides_task)
+            slides = slides.model_copy(deep=True)
 
             # Video Drafting
-            print("       Drafting video script...")
+            logger.info("       Drafting video script...")
             video: Video = await _run_agent_json(
                 self.video_drafter_agent,
                 f"""
-                Slides:
-                {slides.model_dump_json(indent=2)}
-
                 Lesson Summary:
-                {prompt_lesson_summary.model_dump_json(indent=2)}
+                {lesson_summary_json}
 
                 Group Profile:
                 {group.model_dump_json(indent=2)}
+
+                Slides:
+                {slides.model_dump_json(indent=2)}
                 """,
                 Video,
             )
-            print(f"          Created video script: {video.title}")
+            logger.info("          Created video script: %s", video.title)
 
             # Compile teaching pack
             teaching_pack = {
@@ -1102,10 +1332,19 @@ class MASPipeline:
                 "video": video,
                 "quiz": quiz
             }
-            results["teaching_packs"].append(teaching_pack)
+            return teaching_pack
 
-        print("\n[7/7] Pipeline complete!")
-        print(f"    Generated {len(results['teaching_packs'])} teaching packs")
+        packs = await gather_bounded(
+            (_build_pack(i, group) for i, group in enumerate(labeled_groups)),
+            self.max_concurrency,
+        )
+        results["teaching_packs"].extend(packs)
+
+        logger.info("\n[7/7] Pipeline complete!")
+        logger.info("    Generated %s teaching packs", len(results['teaching_packs']))
+        if self.truncation_retries:
+            logger.info("    Truncated-JSON retries: %s", self.truncation_retries)
+        _flush_progress_logging()
 
         return results
 
@@ -1155,6 +1394,28 @@ General rules:
 
 # =====================================================
 
+def _clamp01(value: Any) -> float:
+    try:
+        val = float(value)
+    except Exception:
+        return 0.0
+    if val < 0.0:
+        return 0.0
+    if val > 1.0:
+        return 1.0
+    return val
+
+
+def _clamp_and_average(items: List[Any], attr: str) -> float:
+    """Clamp ``item.<attr>`` to [0, 1] in place and return the mean (0.0 if empty)."""
+    total = 0.0
+    for item in items:
+        val = _clamp01(getattr(item, attr))
+        setattr(item, attr, val)
+        total += val
+    return total / len(items) if items else 0.0
+
+
 class GeminiEvaluator:
     """Uses Gemini to evaluate teaching pack quality"""
 
@@ -1166,8 +1427,18 @@ class GeminiEvaluator:
         "Cognitive load management (not overwhelming, focused on objectives)"
     ]
 
-    def __init__(self, gemini_api_key: str, gemini_model: str = DEFAULT_GEMINI_MODEL):
+    def __init__(
+        self,
+        gemini_api_key: str,
+        gemini_model: str = DEFAULT_GEMINI_MODEL,
+        cache_dir: str | None = None,
+    ):
         """Initialize Gemini evaluator"""
+        # Keyed on the full evaluation prompt, so any change to the lesson,
+        # pack or ground truth misses; the namespace covers model/system prompt.
+        self.response_cache = AgentResponseCache(
+            cache_dir, namespace=f"{gemini_model}|{EVALUATION_SYSTEM_PROMPT}"
+        )
         provider = GoogleProvider(api_key=gemini_api_key)
         self.model = GoogleModel(gemini_model, provider=provider)
 
@@ -1210,7 +1481,7 @@ class GeminiEvaluator:
         ground_truth_section = f"""
 # GROUND TRUTH LESSON SUMMARY
 
-{lesson_summary.model_dump_json(indent=2)}
+{lesson_summary.model_dump_json()}
 """
 
         # Add skill set if provided (for complete concept coverage evaluation)
@@ -1219,7 +1490,7 @@ class GeminiEvaluator:
 
 # GROUND TRUTH SKILLS
 
-{skill_set.model_dump_json(indent=2)}
+{skill_set.model_dump_json()}
 
 **NOTE**: For Concept Coverage (EM) metric, evaluate coverage of BOTH:
 - All key_concepts from lesson summary above
@@ -1232,13 +1503,13 @@ class GeminiEvaluator:
 # GENERATED TEACHING PACK
 
 ## Group Profile
-{group.model_dump_json(indent=2)}
+{group.model_dump_json()}
 
 ## Slides (Total: {len(slides.slides)})
-{slides.model_dump_json(indent=2)}
+{json.dumps(_compact_slides_for_eval(slides), ensure_ascii=False)}
 
 ## Quiz (Total: {len(quiz.questions)} questions)
-{quiz.model_dump_json(indent=2)}
+{json.dumps(_compact_quiz_for_eval(quiz), ensure_ascii=False)}
 
 ---
 
@@ -1263,42 +1534,27 @@ Be strict and objective. Provide brief explanations.
             evaluation_prompt = f"""
 # ADDITIONAL GROUND TRUTH
 
-{json.dumps(ground_truth, indent=2, ensure_ascii=False)}
+{_json_dumps(ground_truth)}
 
 {evaluation_prompt}
 """
 
-        print("\nSending evaluation request to Gemini...")
-        result = await self.eval_agent.run(evaluation_prompt)
-        evaluation: EvaluationResult = result.output
+        cache_key = self.response_cache.key("evaluation", evaluation_prompt, EvaluationResult, None)
+        evaluation: EvaluationResult | None = self.response_cache.get(cache_key, EvaluationResult)
+        if evaluation is None:
+            print("\nSending evaluation request to Gemini...")
+            result = await self.eval_agent.run(evaluation_prompt)
+            evaluation = result.output
+            self.response_cache.put(cache_key, evaluation)
+        else:
+            print("\nUsing cached Gemini evaluation.")
 
         # Normalize and clamp scores in case the judge returns invalid values
-        def _clamp01(value: Any) -> float:
-            try:
-                val = float(value)
-            except Exception:
-                return 0.0
-            if val < 0.0:
-                return 0.0
-            if val > 1.0:
-                return 1.0
-            return val
-
-        def _safe_avg(values: List[float]) -> float:
-            if not values:
-                return 0.0
-            return sum(values) / len(values)
-
-        for score in evaluation.accuracy_scores:
-            score.accuracy = _clamp01(score.accuracy)
-        for coverage in evaluation.concept_coverage:
-            coverage.coverage = _clamp01(coverage.coverage)
-        for soundness in evaluation.educational_soundness:
-            soundness.score = _clamp01(soundness.score)
-
-        evaluation.accuracy_total = _safe_avg([s.accuracy for s in evaluation.accuracy_scores])
-        evaluation.coverage_total = _safe_avg([c.coverage for c in evaluation.concept_coverage])
-        evaluation.educational_soundness_total = _safe_avg([s.score for s in evaluation.educational_soundness])
+        evaluation.accuracy_total = _clamp_and_average(evaluation.accuracy_scores, "accuracy")
+        evaluation.coverage_total = _clamp_and_average(evaluation.concept_coverage, "coverage")
+        evaluation.educational_soundness_total = _clamp_and_average(
+            evaluation.educational_soundness, "score"
+        )
         evaluation.overall_score = (
             0.4 * evaluation.accuracy_total
             + 0.3 * evaluation.coverage_total
@@ -1336,6 +1592,7 @@ async def run_experiment(
     vllm_api_key: str | None = None,
     vllm_lora: str | None = DEFAULT_VLLM_LORA,
     gemini_model: str = DEFAULT_GEMINI_MODEL,
+    agent_cache_dir: str | None = None,
 ):
     """
     Run the complete MAS evaluation experiment
@@ -1346,7 +1603,11 @@ async def run_experiment(
         output_dir: Directory to save results
         num_groups: Number of student groups
         num_students: Total number of students
+        agent_cache_dir: Optional directory for persisting vLLM agent responses
+            and Gemini evaluations (under ``gemini_eval/``)
     """
+    _start_progress_logging()
+
     # Load API key
     gemini_api_key = os.getenv("GEMINI_API_KEY")
     if not gemini_api_key:
@@ -1354,10 +1615,20 @@ async def run_experiment(
     # Initialize pipeline and evaluator (needed for PDF parsing too)
     print("\n Initializing MAS Pipeline (vLLM)...")
     vllm_api_key = vllm_api_key or os.getenv("VLLM_API_KEY") or os.getenv("OPENAI_API_KEY")
-    pipeline = MASPipeline(vllm_base_url, vllm_model, vllm_api_key, vllm_lora)
+    pipeline = MASPipeline(
+        vllm_base_url,
+        vllm_model,
+        vllm_api_key,
+        vllm_lora,
+        agent_cache_dir=agent_cache_dir,
+    )
 
     print(" Initializing Gemini Evaluator...")
-    evaluator = GeminiEvaluator(gemini_api_key, gemini_model)
+    evaluator = GeminiEvaluator(
+        gemini_api_key,
+        gemini_model,
+        cache_dir=str(Path(agent_cache_dir) / "gemini_eval") if agent_cache_dir else None,
+    )
 
     # Load lesson summary (JSON or PDF)
     print(f"\n Loading lesson summary from: {lesson_summary_path}")
@@ -1375,8 +1646,8 @@ async def run_experiment(
                 )
             print("[DEBUG] Calling LessonParserAgent...")
             try:
-                lesson_summary = await _run_agent_json(
-                    pipeline.lesson_parser_agent,
+                lesson_summary = await pipeline._run_cached(
+                    "lesson_parser",
                     lesson_text + "\n\nReturn ONLY JSON matching the LessonSummary schema.",
                     LessonSummary,
                 )
@@ -1458,44 +1729,40 @@ async def run_experiment(
     teaching_pack_output_path = Path(output_dir) / output_file_name
     print(f"\n Teaching pack exported: {teaching_pack_output_path}")
 
-    # Reload from exported file to ensure evaluation uses the generated JSON output
-    teaching_packs_for_eval: List[Dict[str, Any]] = []
-    with open(teaching_pack_output_path, 'r', encoding='utf-8') as f:
-        exported_data = json.load(f)
-    for pack in exported_data.get("teaching_packs", []):
-        teaching_packs_for_eval.append({
-            "group": GroupProfile(**pack["group"]),
-            "pack_plan": PackPlan(**pack["pack_plan"]),
-            "slides": Slides(**pack["slides"]),
-            "video": Video(**pack["video"]),
-            "quiz": Quiz(**pack["quiz"]),
-        })
+    # The exported file is a plain dump of these models, so evaluate them
+    # directly rather than reloading and re-validating the JSON.
+    teaching_packs_for_eval: List[Dict[str, Any]] = results["teaching_packs"]
 
     # Evaluate each teaching pack
     print("\n" + "=" * 80)
     print("PHASE 2: EVALUATING TEACHING PACKS")
     print("=" * 80)
 
-    evaluations = []
     eval_lesson_summary = gt_lesson_summary or lesson_summary
     eval_skill_set = gt_skill_set or results.get("skill_set")
 
-    for i, teaching_pack in enumerate(teaching_packs_for_eval):
-        print(f"\n Evaluating teaching pack {i+1}/{len(teaching_packs_for_eval)}...")
-        print(f"   Group: {teaching_pack['group'].group_name}")
+    print(f"\n Evaluating {len(teaching_packs_for_eval)} teaching packs (concurrency {DEFAULT_EVAL_CONCURRENCY})...")
 
-        evaluation = await evaluator.evaluate(
-            lesson_summary=eval_lesson_summary,
-            teaching_pack=teaching_pack,
-            skill_set=eval_skill_set,
-            ground_truth=ground_truth
-        )
-
-        evaluations.append({
+    pack_evaluations = await gather_bounded(
+        (
+            evaluator.evaluate(
+                lesson_summary=eval_lesson_summary,
+                teaching_pack=teaching_pack,
+                skill_set=eval_skill_set,
+                ground_truth=ground_truth
+            )
+            for teaching_pack in teaching_packs_for_eval
+        ),
+        DEFAULT_EVAL_CONCURRENCY,
+    )
+    evaluations = [
+        {
             "group_id": teaching_pack["group"].group_id,
             "group_name": teaching_pack["group"].group_name,
             "evaluation": evaluation
-        })
+        }
+        for teaching_pack, evaluation in zip(teaching_packs_for_eval, pack_evaluations)
+    ]
 
     # Save results
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -1505,23 +1772,23 @@ async def run_experiment(
     # Save complete results
     results_file = output_path / f"experiment_results_{timestamp}.json"
     with open(results_file, 'w', encoding='utf-8') as f:
-        json.dump({
-            "timestamp": timestamp,
-            "lesson_summary": lesson_summary.model_dump(),
-            "skill_set": results["skill_set"].model_dump() if results.get("skill_set") else None,
-            "num_groups": num_groups,
-            "num_students": num_students,
-            "teaching_packs": serialized_packs,
-            "teaching_pack_output_file": str(teaching_pack_output_path),
-            "evaluations": [
+        _write_json_streamed(f, [
+            ("timestamp", timestamp),
+            ("lesson_summary", lesson_summary.model_dump()),
+            ("skill_set", results["skill_set"].model_dump() if results.get("skill_set") else None),
+            ("num_groups", num_groups),
+            ("num_students", num_students),
+            ("teaching_packs", iter(serialized_packs)),
+            ("teaching_pack_output_file", str(teaching_pack_output_path)),
+            ("evaluations", (
                 {
                     "group_id": e["group_id"],
                     "group_name": e["group_name"],
                     "evaluation": e["evaluation"].model_dump()
                 }
                 for e in evaluations
-            ]
-        }, f, indent=2, ensure_ascii=False)
+            )),
+        ])
 
     print(f"\n Results saved to: {results_file}")
 
@@ -1628,6 +1895,12 @@ def main():
         default=None,
         help="Gemini model to use for evaluation (default: from config)"
     )
+    parser.add_argument(
+        "--agent_cache_dir",
+        type=str,
+        default=None,
+        help="Directory to persist vLLM agent responses and Gemini evaluations across runs (default: from config, disabled if unset)"
+    )
     parser.add_argument(
         "--seed",
         type=int,
@@ -1648,6 +1921,7 @@ def main():
     vllm_lora = resolve_value(args.vllm_lora, config, ["models", "vllm", "lora"], DEFAULT_VLLM_LORA)
     vllm_api_key = resolve_value(args.vllm_api_key, config, ["models", "vllm", "api_key"], None)
     gemini_model = resolve_value(args.gemini_model, config, ["models", "mas", "evaluator"], DEFAULT_GEMINI_MODEL)
+    agent_cache_dir = resolve_value(args.agent_cache_dir, config, ["paths", "agent_cache_dir"], None)
 
     set_seed(seed)
 
@@ -1663,6 +1937,7 @@ def main():
         vllm_api_key=vllm_api_key,
         vllm_lora=vllm_lora,
         gemini_model=gemini_model,
+        agent_cache_dir=agent_cache_dir,
     ))
 
 
@@ -10,9 +10,16 @@ Usage:
 
 import os
 import sys
+import json
+import mmap
 import asyncio
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Add project root to path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
@@ -37,24 +44,39 @@ async def main():
 
     # Find an existing teaching pack
     outputs_dir = project_root / "outputs"
-    teaching_packs = list(outputs_dir.glob("teaching_packs_*.json"))
-
-    if not teaching_packs:
+    # Single directory pass; DirEntry.stat() reuses scandir's lookup where the OS allows.
+    latest_entry = None
+    if outputs_dir.is_dir():
+        with os.scandir(outputs_dir) as it:
+            latest_entry = max(
+                (
+                    e for e in it
+                    if e.name.startswith("teaching_packs_") and e.name.endswith(".json") and e.is_file()
+                ),
+                key=lambda e: e.stat().st_mtime,
+                default=None,
+            )
+
+    if latest_entry is None:
         print("\n❌ ERROR: No teaching pack files found in outputs/")
         print("\nPlease generate a teaching pack first using the main API.")
         return
 
     # Use the most recent teaching pack
-    latest_pack = max(teaching_packs, key=lambda p: p.stat().st_mtime)
+    latest_pack = Path(latest_entry.path)
 
     print(f"\n✅ Found teaching pack: {latest_pack.name}")
     print(f"   Using this for quick test...\n")
 
     # Extract lesson summary first
     print("Step 1: Extracting lesson summary...")
-    import json
-    with open(latest_pack, 'r', encoding='utf-8') as f:
-        teaching_pack = json.load(f)
+    with open(latest_pack, 'rb') as f:
+        if orjson is not None:
+            # Parse straight from the mapped file; no intermediate str copy.
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as buf:
+                teaching_pack = orjson.loads(buf)
+        else:
+            teaching_pack = json.load(f)
 
     if "lesson_summary" not in teaching_pack:
         print("❌ ERROR: No lesson_summary found in teaching pack")
@@ -62,8 +84,11 @@ async def main():
 
     # Save temporary lesson summary
     temp_lesson = project_root / "experiments" / "temp_lesson_summary.json"
-    with open(temp_lesson, 'w', encoding='utf-8') as f:
-        json.dump(teaching_pack["lesson_summary"], f, indent=2, ensure_ascii=False)
+    if orjson is not None:
+        temp_lesson.write_bytes(orjson.dumps(teaching_pack["lesson_summary"], option=orjson.OPT_INDENT_2))
+    else:
+        with open(temp_lesson, 'w', encoding='utf-8') as f:
+            json.dump(teaching_pack["lesson_summary"], f, indent=2, ensure_ascii=False)
 
     print(f"   ✓ Lesson summary extracted")
     print(f"   ✓ Title: {teaching_pack['lesson_summary']['title']}")
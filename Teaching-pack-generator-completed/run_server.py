@@ -14,6 +14,7 @@ src_path = Path(__file__).parent / "src"
 sys.path.insert(0, str(src_path))
 
 if __name__ == "__main__":
+    import os
     import uvicorn
     
     uvicorn.run(
@@ -22,5 +23,11 @@ if __name__ == "__main__":
         port=8000,
         # reload=True,
         reload = False,
-        log_level="info"
+        log_level="info",
+        # uvloop + httptools ship with uvicorn[standard]; uvloop has no Windows build.
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        # Every worker runs the startup migrations, so scale out deliberately.
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+        access_log=False,
     )
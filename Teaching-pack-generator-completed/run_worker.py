@@ -1,18 +1,33 @@
 import os
 
 from dotenv import load_dotenv
-from redis import Redis
+from redis import ConnectionPool, Redis
 from rq import Queue, Worker
+from rq.worker_pool import WorkerPool
 
 load_dotenv()
 
 
 def main() -> None:
     redis_url = os.getenv("REDIS_URL", "redis://redis:6379/0")
-    conn = Redis.from_url(redis_url)
+    # redis-py picks the hiredis parser automatically when it is installed.
+    pool = ConnectionPool.from_url(
+        redis_url,
+        max_connections=64,
+        socket_keepalive=True,
+        health_check_interval=30,
+    )
+    conn = Redis(connection_pool=pool)
     queues = [Queue("teachingpack", connection=conn)]
-    worker = Worker(queues, connection=conn)
-    worker.work()
+    # Jobs spend most of their time waiting on Gemini, so run several worker
+    # processes side by side. RQ_WORKERS=1 keeps the single in-process worker.
+    num_workers = int(os.getenv("RQ_WORKERS", "8"))
+    if num_workers <= 1:
+        worker = Worker(queues, connection=conn)
+        worker.work()
+        return
+    pool = WorkerPool(queues, connection=conn, num_workers=num_workers)
+    pool.start()
 
 
 if __name__ == "__main__":
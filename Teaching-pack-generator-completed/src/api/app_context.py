@@ -1,16 +1,16 @@
 # src/api/app_context.py
+import importlib.util
 import os
+from functools import lru_cache
 from pathlib import Path
+from typing import Callable, Optional, Tuple
+import httpx
 from dotenv import load_dotenv
 
 load_dotenv()
 
-from pydantic_ai.models.google import GoogleModel
-from pydantic_ai.providers.google import GoogleProvider
-
-from llm.base import AgentClient
-
-# prompts
+# prompts (shared str constants; pydantic-ai embeds them in a JSON request
+# body it serializes per call, so a pre-encoded bytes form would never be used)
 from data.prompts.teaching_pack_prompts import (
     LESSON_PARSER_PROMPT, SKILL_MAPPER_PROMPT, DIAGNOSTIC_BUILDER_PROMPT,
     GROUP_LABELER_PROMPT, PACK_PLANNER_PROMPT,
@@ -36,50 +36,87 @@ OUTPUT_DIR = Path("outputs")
 OUTPUT_DIR.mkdir(exist_ok=True)
 
 # ====== MODEL ======
-provider = GoogleProvider(api_key=os.getenv("GEMINI_API_KEY"))
-model = GoogleModel("gemini-2.0-flash", provider=provider)
+# Agents, the model and its HTTP client are built on first use, so importing
+# this module (e.g. in a forked worker that needs one agent) stays cheap.
+@lru_cache(maxsize=1)
+def get_http_client() -> httpx.AsyncClient:
+    """One pooled client for every agent, sized for concurrent Gemini fan-out.
+
+    HTTP/2 multiplexing is used when the optional h2 package is installed.
+    """
+    return httpx.AsyncClient(
+        http2=importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(max_connections=512, max_keepalive_connections=256),
+        timeout=httpx.Timeout(60.0),
+    )
+
+
+@lru_cache(maxsize=1)
+def get_model():
+    from pydantic_ai.models.google import GoogleModel
+    from pydantic_ai.providers.google import GoogleProvider
+
+    provider = GoogleProvider(api_key=os.getenv("GEMINI_API_KEY"), http_client=get_http_client())
+    return GoogleModel("gemini-2.0-flash", provider=provider)
+
 
 # ====== AGENTS ======
-lesson_parser_agent = AgentClient(
-    model=model, system_prompt=LESSON_PARSER_PROMPT, tools=[extract_text_from_pdf]
-).create_agent(result_type=LessonSummary)
+@lru_cache(maxsize=None)
+def _make_agent(system_prompt: str, result_type: Optional[type] = None, tools: Tuple[Callable, ...] = ()):
+    """Build one agent per (prompt, result_type, tools); repeat lookups share it."""
+    from llm.base import AgentClient
+
+    return AgentClient(
+        model=get_model(), system_prompt=system_prompt, tools=list(tools)
+    ).create_agent(result_type=result_type)
+
+
+def lesson_parser_agent():
+    return _make_agent(LESSON_PARSER_PROMPT, LessonSummary, (extract_text_from_pdf,))
+
+
+def skill_mapper_agent():
+    return _make_agent(SKILL_MAPPER_PROMPT, SkillSet)
+
+
+def diagnostic_builder_agent():
+    return _make_agent(DIAGNOSTIC_BUILDER_PROMPT, Diagnostic)
+
+
+def group_labeler_agent():
+    return _make_agent(GROUP_LABELER_PROMPT, GroupProfile)
+
+
+def pack_planner_agent():
+    return _make_agent(PACK_PLANNER_PROMPT, PackPlan)
+
+
+def slide_drafter_agent():
+    return _make_agent(SLIDE_DRAFTER_PROMPT, Slides)
+
+
+def quiz_practice_agent():
+    return _make_agent(QUIZ_PRACTICE_PROMPT, Quiz)
 
-skill_mapper_agent = AgentClient(
-    model=model, system_prompt=SKILL_MAPPER_PROMPT, tools=[]
-).create_agent(result_type=SkillSet)
 
-diagnostic_builder_agent = AgentClient(
-    model=model, system_prompt=DIAGNOSTIC_BUILDER_PROMPT, tools=[]
-).create_agent(result_type=Diagnostic)
+def theory_question_agent():
+    return _make_agent(THEORY_QUESTION_GENERATOR_PROMPT, TheoryQuestionSet)
 
-group_labeler_agent = AgentClient(
-    model=model, system_prompt=GROUP_LABELER_PROMPT, tools=[]
-).create_agent(result_type=GroupProfile)
 
-pack_planner_agent = AgentClient(
-    model=model, system_prompt=PACK_PLANNER_PROMPT, tools=[]
-).create_agent(result_type=PackPlan)
+def flashcard_agent():
+    return _make_agent(FLASHCARD_GENERATOR_PROMPT, FlashcardSet)
 
-slide_drafter_agent = AgentClient(
-    model=model, system_prompt=SLIDE_DRAFTER_PROMPT, tools=[]
-).create_agent(result_type=Slides)
 
-quiz_practice_agent = AgentClient(
-    model=model, system_prompt=QUIZ_PRACTICE_PROMPT, tools=[]
-).create_agent(result_type=Quiz)
+def flashcard_group_agent():
+    return _make_agent(FLASHCARD_GROUP_GENERATOR_PROMPT, FlashcardSet)
 
-theory_question_agent = AgentClient(
-    model=model, system_prompt=THEORY_QUESTION_GENERATOR_PROMPT, tools=[]
-).create_agent(result_type=TheoryQuestionSet)
 
-flashcard_agent = AgentClient(
-    model=model, system_prompt=FLASHCARD_GENERATOR_PROMPT, tools=[]
-).create_agent(result_type=FlashcardSet)
+def video_drafter_agent():
+    return _make_agent(VIDEO_DRAFTER_PROMPT)
 
-flashcard_group_agent = AgentClient(
-    model=model, system_prompt=FLASHCARD_GROUP_GENERATOR_PROMPT, tools=[]
-).create_agent(result_type=FlashcardSet)
 
-video_drafter_agent = AgentClient(
-    model=model, system_prompt=VIDEO_DRAFTER_PROMPT, tools=[]
-).create_agent()
+async def close_http_client() -> None:
+    """Close the shared Gemini HTTP client if it was ever created; call on shutdown."""
+    if get_http_client.cache_info().currsize:
+        await get_http_client().aclose()
+        get_http_client.cache_clear()
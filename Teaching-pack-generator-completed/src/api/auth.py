@@ -2,13 +2,15 @@
 Authentication and Authorization Module
 JWT-based authentication for Teaching Pack Generator API
 """
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
-from fastapi import Depends, HTTPException, status
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Annotated, Optional, Dict, Any, Tuple
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import JWTError, jwt
+import jwt
 from passlib.context import CryptContext
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, StringConstraints
 import os
 from sqlalchemy.orm import Session
 
@@ -20,6 +22,7 @@ from models.database_service import get_user_by_email, create_user
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-this-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
+_DEFAULT_EXPIRE_SECONDS = ACCESS_TOKEN_EXPIRE_MINUTES * 60
 
 # Password hashing
 pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
@@ -27,6 +30,31 @@ pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 # HTTP Bearer token
 security = HTTPBearer()
 
+# Verified token -> (subject email, exp timestamp). Only tokens that passed
+# jwt.decode are stored, and entries are never served past their own exp.
+_TOKEN_CACHE_MAX = 10_000
+_token_cache: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+
+def _decode_token_subject(token: str) -> Optional[str]:
+    """Return the token's ``sub`` claim, reusing earlier verifications of the same token."""
+    cached = _token_cache.get(token)
+    if cached is not None:
+        email, exp = cached
+        if time.time() < exp:
+            _token_cache.move_to_end(token)
+            return email
+        del _token_cache[token]
+
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    email = payload.get("sub")
+    exp = payload.get("exp")
+    if email is not None and isinstance(exp, (int, float)):
+        _token_cache[token] = (email, float(exp))
+        if len(_token_cache) > _TOKEN_CACHE_MAX:
+            _token_cache.popitem(last=False)
+    return email
+
 
 class Token(BaseModel):
     access_token: str
@@ -37,13 +65,10 @@ class TokenData(BaseModel):
     email: Optional[str] = None
 
 
-class User(BaseModel):
+class UserInDB(BaseModel):
     email: str
     full_name: str
     role: str
-
-
-class UserInDB(User):
     hashed_password: str
 
 
@@ -59,54 +84,22 @@ class LoginRequest(BaseModel):
     password: str
 
 class RegisterRequest(BaseModel):
-    email: str
-    password: str
-    full_name: str
-
-    @field_validator('email')
-    @classmethod
-    def validate_email(cls, v):
-        if '@' not in v:
-            raise ValueError('Invalid email format')
-        return v
-
-    @field_validator('password')
-    @classmethod
-    def validate_password(cls, v):
-        if len(v) < 6:
-            raise ValueError('Password must be at least 6 characters long')
-        return v
-
-    @field_validator('full_name')
-    @classmethod
-    def validate_full_name(cls, v):
-        if len(v.strip()) < 2:
-            raise ValueError('Full name must be at least 2 characters long')
-        return v.strip()
-
+    # Constraints run inside pydantic-core instead of Python validators.
+    email: Annotated[str, StringConstraints(pattern=r'^[^@]*@')]
+    password: Annotated[str, StringConstraints(min_length=6)]
+    full_name: Annotated[str, StringConstraints(strip_whitespace=True, min_length=2)]
+
+# pbkdf2_sha256 has no 72-byte input limit (that is a bcrypt restriction), so
+# passwords are hashed and verified as-is; truncating here would lock out
+# existing users whose long passwords were hashed in full.
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
-    try:
-        return pwd_context.verify(plain_password, hashed_password)
-    except ValueError as e:
-        if "password cannot be longer than 72 bytes" in str(e):
-            # Password is too long, this shouldn't happen with proper truncation
-            # For existing long passwords, try verifying with truncated version
-            truncated_password = plain_password[:72]
-            return pwd_context.verify(truncated_password, hashed_password)
-        raise
+    return pwd_context.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """Hash a password"""
-    try:
-        return pwd_context.hash(password)
-    except ValueError as e:
-        if "password cannot be longer than 72 bytes" in str(e):
-            # Truncate password if it's too long
-            truncated_password = password[:72]
-            return pwd_context.hash(truncated_password)
-        raise
+    return pwd_context.hash(password)
 
 
 def get_user(db: Session, email: str) -> Optional[User]:
@@ -126,14 +119,13 @@ def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
-    to_encode = data.copy()
+    # exp as a plain epoch int; same claim value PyJWT derives from a datetime.
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = int(time.time() + expires_delta.total_seconds())
     else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = int(time.time()) + _DEFAULT_EXPIRE_SECONDS
 
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode({**data, "exp": expire}, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
@@ -147,12 +139,11 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
 
     try:
         token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")#type: ignore
+        email: str = _decode_token_subject(token)#type: ignore
         if email is None:
             raise credentials_exception
         token_data = TokenData(email=email)
-    except JWTError:
+    except jwt.PyJWTError:
         raise credentials_exception
 
     user = get_user(db, email=token_data.email)#type: ignore
@@ -162,10 +153,13 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     return user
 
 
-async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_active_user(request: Request, current_user: User = Depends(get_current_user)) -> User:
     """Get current active user"""
     if not current_user.is_active:#type: ignore
         raise HTTPException(status_code=400, detail="Inactive user")
+    # FastAPI already resolves this dependency once per request; exposing the
+    # user on request.state lets middleware and helpers reuse it without a DB hit.
+    request.state.user = current_user
     return current_user
 
 
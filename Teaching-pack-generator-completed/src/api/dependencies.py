@@ -1,14 +1,29 @@
 """
 Shared dependencies for API routes
 """
-from fastapi import Depends
+from fastapi import Depends, HTTPException
 from typing import Annotated
 from sqlalchemy.orm import Session
 
 from api.auth import get_current_active_user
 from models.database import get_db
-from models.database_models import User
+from models.database_models import Classroom, User
 
 # Dependency shortcuts
 CurrentUser = Annotated[User, Depends(get_current_active_user)]
 DBSession = Annotated[Session, Depends(get_db)]
+
+
+def get_owned_classroom(classroom_id: int, current_user: CurrentUser, db: DBSession) -> Classroom:
+    """Classroom from the path, 404 unless the current user teaches it (resolved once per request)"""
+    # Existence and ownership in one query; another teacher's row is never loaded
+    classroom = db.query(Classroom).filter(
+        Classroom.id == classroom_id,
+        Classroom.teacher_id == current_user.id
+    ).first()
+    if not classroom:
+        raise HTTPException(status_code=404, detail="Classroom not found")
+    return classroom
+
+
+OwnedClassroom = Annotated[Classroom, Depends(get_owned_classroom)]
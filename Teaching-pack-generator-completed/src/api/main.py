@@ -10,16 +10,20 @@ load_dotenv()
 
 import uuid
 import asyncio
-import requests
+import hashlib
+import aiofiles
+import orjson
+from contextlib import asynccontextmanager
 from typing import List, Dict, Optional
 from datetime import timedelta
 from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks, Depends, Form
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, ORJSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
-from pydantic_ai.models.google import GoogleModel
-from pydantic_ai.providers.google import GoogleProvider
+from pydantic import BaseModel, ValidationError
+from pydantic_ai import Tool
+from pydantic_ai.settings import ModelSettings
 from loguru import logger
 import uuid
 from pathlib import Path
@@ -32,6 +36,9 @@ from api.auth import (
     ACCESS_TOKEN_EXPIRE_MINUTES, UserRole
 )
 
+# Import Redis connection
+from api.queue import get_redis
+
 # Import database models
 from models.database_models import User, Lesson, TeachingPack
 
@@ -45,7 +52,7 @@ from models.database_service import (
 )
 
 # Import AgentClient
-from llm.base import AgentClient
+from llm.base import AgentClient, model
 
 # Import prompts
 from data.prompts.teaching_pack_prompts import (
@@ -76,13 +83,60 @@ from utils.basetools.grouping_utils import profile_groups_by_quartile
 from utils.basetools.heterogeneous_grouping import heterogeneous_grouping_by_subject, ai_grouping_by_subject
 from utils.basetools.slide_tools import generate_slides_from_text, search_themes
 from utils.basetools.video_tools import generate_video_from_prompt
-from utils.basetools.pdf_parser import extract_text_from_pdf
+from utils.basetools.pdf_parser import extract_text_from_pdf_async
 from utils.r2_storage import upload_fileobj_to_r2
 from utils.r2_public import r2_public_url, safe_key
 
 
+# ============= STARTUP =============
+def run_migrations():
+    """Run `alembic upgrade head` in-process instead of spawning the CLI"""
+    from alembic import command
+    from alembic.config import Config
+
+    project_root = Path(__file__).resolve().parents[2]
+    cfg = Config(str(project_root / "alembic.ini"), attributes={"configure_logger": False})
+    cfg.set_main_option("script_location", str(project_root / "alembic"))
+    command.upgrade(cfg, "head")
+
+
+async def init_database():
+    """Run migrations, then create any tables they didn't"""
+    try:
+        logger.info("Running database migrations...")
+        await asyncio.to_thread(run_migrations)
+        logger.info(" Database migrations completed")
+    except Exception as e:
+        logger.warning(f"  Migration failed: {e}")
+
+    # create_tables must follow the migrations, so these two stay sequential
+    await asyncio.to_thread(create_tables)
+    logger.info(" Database tables created/verified")
+
+
+async def check_redis():
+    """Open the shared Redis connection early so the first enqueue doesn't pay for it"""
+    try:
+        await asyncio.to_thread(get_redis().ping)
+        logger.info(" Redis connection verified")
+    except Exception as e:
+        logger.warning(f"  Redis ping failed: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize database and Redis concurrently on startup"""
+    await asyncio.gather(init_database(), check_redis())
+    # Model validators are built at import; the OpenAPI schema is the one lazily
+    # generated piece, so build it now rather than on the first /docs request.
+    app.openapi()
+    yield
+
+
 # ============= FASTAPI APP SETUP =============
 app = FastAPI(
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     title="Teaching Pack Generator API",
     description="Multi-agent system for automatic teaching pack generation with differentiated instruction",
     version="1.0.0",
@@ -90,50 +144,8 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
-# Custom middleware to ensure CORS headers are always added, even on errors
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
-
-class CORSErrorMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        # Handle preflight OPTIONS request
-        if request.method == "OPTIONS":
-            return Response(
-                status_code=200,
-                headers={
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Methods": "*",
-                    "Access-Control-Allow-Headers": "*",
-                    "Access-Control-Max-Age": "86400",
-                }
-            )
-        
-        try:
-            response = await call_next(request)
-            # Ensure CORS headers are present
-            response.headers["Access-Control-Allow-Origin"] = "*"
-            response.headers["Access-Control-Allow-Methods"] = "*"
-            response.headers["Access-Control-Allow-Headers"] = "*"
-            return response
-        except Exception as e:
-            logger.error(f"Middleware caught exception: {e}")
-            import traceback
-            logger.error(f"Traceback: {traceback.format_exc()}")
-            return JSONResponse(
-                status_code=500,
-                content={"detail": str(e)},
-                headers={
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Methods": "*",
-                    "Access-Control-Allow-Headers": "*",
-                }
-            )
-
-# Add custom CORS error middleware FIRST (it will run last, wrapping everything)
-app.add_middleware(CORSErrorMiddleware)
-
-# Enable CORS
+# Enable CORS. CORSMiddleware answers preflight requests and adds headers to normal
+# and HTTPException responses; unhandled 500s get theirs from the exception handler below.
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -141,8 +153,31 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
     expose_headers=["*"],
+    max_age=86400,
 )
 
+# Files that are already compressed (or are fetched with Range requests) skip gzip
+PRECOMPRESSED_SUFFIXES = frozenset({
+    ".pptx", ".docx", ".xlsx", ".zip", ".pdf", ".mp4", ".webm", ".png", ".jpg", ".jpeg", ".gif", ".webp"
+})
+
+
+class SelectiveGZipMiddleware:
+    """GZip text responses (JSON, HTML) but pass binary downloads through untouched"""
+
+    def __init__(self, app, minimum_size: int = 1024):
+        self.app = app
+        self.gzip_app = GZipMiddleware(app, minimum_size=minimum_size)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and Path(scope["path"]).suffix.lower() not in PRECOMPRESSED_SUFFIXES:
+            await self.gzip_app(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+
+app.add_middleware(SelectiveGZipMiddleware, minimum_size=1024)
+
 # Global exception handler to ensure CORS headers are always sent
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
@@ -160,50 +195,116 @@ async def global_exception_handler(request, exc):
         }
     )
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize database on startup"""
-    # Run database migrations first
-    try:
-        logger.info("Running database migrations...")
-        import subprocess
-        result = subprocess.run(["alembic", "upgrade", "head"],
-                              capture_output=True, text=True, cwd="/app")
-        if result.returncode == 0:
-            logger.info(" Database migrations completed")
-        else:
-            logger.warning(f"  Migration output: {result.stdout}")
-            logger.error(f" Migration error: {result.stderr}")
-    except Exception as e:
-        logger.warning(f"  Migration failed: {e}")
-
-    # Then create tables (in case migrations didn't create them)
-    create_tables()
-    logger.info(" Database tables created/verified")
-
-
 # ============= MODEL CONFIGURATION =============
-provider = GoogleProvider(api_key=os.getenv("GEMINI_API_KEY"))
-model = GoogleModel('gemini-2.0-flash', provider=provider)
+# No explicit Gemini context caches for the system prompts: each is well under
+# the minimum cacheable size (the largest, SLIDE_AUTHOR_PROMPT, is ~700 tokens),
+# and a combined cache can't serve agents with different system instructions.
+#
+# Agents share llm.base's GoogleModel so the process holds a single provider/HTTP client
+
+# Per-role output caps, sized with headroom over each structured result, so a
+# runaway generation stops early; extraction roles also sample conservatively.
+AGENT_SETTINGS: Dict[str, ModelSettings] = {
+    "lesson_parser": ModelSettings(max_tokens=4096, temperature=0.2),
+    "skill_mapper": ModelSettings(max_tokens=2048, temperature=0.2),
+    "diagnostic_builder": ModelSettings(max_tokens=4096, temperature=0.2),
+    "group_labeler": ModelSettings(max_tokens=1024),
+    "pack_planner": ModelSettings(max_tokens=4096),
+    "slide_drafter": ModelSettings(max_tokens=8192),
+    "quiz_practice": ModelSettings(max_tokens=8192),
+    "theory_question": ModelSettings(max_tokens=8192),
+    "flashcard": ModelSettings(max_tokens=8192),
+    "flashcard_group": ModelSettings(max_tokens=8192),
+    "video_drafter": ModelSettings(max_tokens=4096),
+}
 
 # AGENTS INITIALIZATION =============
-lesson_parser_agent = AgentClient(model=model, system_prompt=LESSON_PARSER_PROMPT, tools=[extract_text_from_pdf]).create_agent(result_type=LessonSummary)
-skill_mapper_agent = AgentClient(model=model, system_prompt=SKILL_MAPPER_PROMPT, tools=[]).create_agent(result_type=SkillSet)
-diagnostic_builder_agent = AgentClient(model=model, system_prompt=DIAGNOSTIC_BUILDER_PROMPT, tools=[]).create_agent(result_type=Diagnostic)
-group_labeler_agent = AgentClient(model=model, system_prompt=GROUP_LABELER_PROMPT, tools=[]).create_agent(result_type=GroupProfile)
-pack_planner_agent = AgentClient(model=model, system_prompt=PACK_PLANNER_PROMPT, tools=[]).create_agent(result_type=PackPlan)
-slide_drafter_agent = AgentClient(model=model, system_prompt=SLIDE_DRAFTER_PROMPT, tools=[]).create_agent(result_type=Slides)  # Removed search_themes to avoid rate limit
-quiz_practice_agent = AgentClient(model=model, system_prompt=QUIZ_PRACTICE_PROMPT, tools=[]).create_agent(result_type=Quiz)
-theory_question_agent = AgentClient(model=model, system_prompt=THEORY_QUESTION_GENERATOR_PROMPT, tools=[]).create_agent(result_type=TheoryQuestionSet)
-flashcard_agent = AgentClient(model=model, system_prompt=FLASHCARD_GENERATOR_PROMPT, tools=[]).create_agent(result_type=FlashcardSet)
-flashcard_group_agent = AgentClient(model=model, system_prompt=FLASHCARD_GROUP_GENERATOR_PROMPT, tools=[]).create_agent(result_type=FlashcardSet)
-video_drafter_agent = AgentClient(model=model, system_prompt=VIDEO_DRAFTER_PROMPT, tools=[]).create_agent(result_type=Video)
+lesson_parser_agent = AgentClient(model=model, system_prompt=LESSON_PARSER_PROMPT, tools=[Tool(extract_text_from_pdf_async, name="extract_text_from_pdf")], model_settings=AGENT_SETTINGS["lesson_parser"]).create_agent(result_type=LessonSummary)
+skill_mapper_agent = AgentClient(model=model, system_prompt=SKILL_MAPPER_PROMPT, tools=[], model_settings=AGENT_SETTINGS["skill_mapper"]).create_agent(result_type=SkillSet)
+diagnostic_builder_agent = AgentClient(model=model, system_prompt=DIAGNOSTIC_BUILDER_PROMPT, tools=[], model_settings=AGENT_SETTINGS["diagnostic_builder"]).create_agent(result_type=Diagnostic)
+group_labeler_agent = AgentClient(model=model, system_prompt=GROUP_LABELER_PROMPT, tools=[], model_settings=AGENT_SETTINGS["group_labeler"]).create_agent(result_type=GroupProfile)
+pack_planner_agent = AgentClient(model=model, system_prompt=PACK_PLANNER_PROMPT, tools=[], model_settings=AGENT_SETTINGS["pack_planner"]).create_agent(result_type=PackPlan)
+slide_drafter_agent = AgentClient(model=model, system_prompt=SLIDE_DRAFTER_PROMPT, tools=[], model_settings=AGENT_SETTINGS["slide_drafter"]).create_agent(result_type=Slides)  # Removed search_themes to avoid rate limit
+quiz_practice_agent = AgentClient(model=model, system_prompt=QUIZ_PRACTICE_PROMPT, tools=[], model_settings=AGENT_SETTINGS["quiz_practice"]).create_agent(result_type=Quiz)
+theory_question_agent = AgentClient(model=model, system_prompt=THEORY_QUESTION_GENERATOR_PROMPT, tools=[], model_settings=AGENT_SETTINGS["theory_question"]).create_agent(result_type=TheoryQuestionSet)
+flashcard_agent = AgentClient(model=model, system_prompt=FLASHCARD_GENERATOR_PROMPT, tools=[], model_settings=AGENT_SETTINGS["flashcard"]).create_agent(result_type=FlashcardSet)
+flashcard_group_agent = AgentClient(model=model, system_prompt=FLASHCARD_GROUP_GENERATOR_PROMPT, tools=[], model_settings=AGENT_SETTINGS["flashcard_group"]).create_agent(result_type=FlashcardSet)
+video_drafter_agent = AgentClient(model=model, system_prompt=VIDEO_DRAFTER_PROMPT, tools=[], model_settings=AGENT_SETTINGS["video_drafter"]).create_agent(result_type=Video)
 
 # ============= STORAGE FOR ASYNC JOBS =============
 jobs_storage = {}
 OUTPUT_DIR = Path("outputs")
 OUTPUT_DIR.mkdir(exist_ok=True)
 
+# Max concurrent agent calls for the /batch endpoints
+BATCH_CONCURRENCY = 8
+
+# Parsed lesson summaries cached in Redis by SHA-256 of the uploaded file
+LESSON_CACHE_PREFIX = "lp:"
+LESSON_CACHE_TTL_SECONDS = 24 * 60 * 60
+
+# Lesson parses currently running, by content hash, so duplicate uploads await the same call
+_inflight_lesson_parses: Dict[str, asyncio.Future] = {}
+
+
+# ============= HELPER FUNCTIONS =============
+async def save_upload_file(upload_file: UploadFile, destination: Path) -> str:
+    """Stream uploaded file to destination in 1MB chunks and return its SHA-256 hex digest"""
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+    async with aiofiles.open(destination, "wb") as f:
+        while chunk := await upload_file.read(1024 * 1024):
+            digest.update(chunk)
+            await f.write(chunk)
+    await upload_file.close()
+    return digest.hexdigest()
+
+
+async def get_cached_lesson_summary(content_hash: str) -> Optional[LessonSummary]:
+    """Return the parsed summary for a previously uploaded file with the same content"""
+    try:
+        # Sync client, so keep the round-trip off the event loop
+        cached = await asyncio.to_thread(get_redis().get, f"{LESSON_CACHE_PREFIX}{content_hash}")
+    except Exception as e:
+        logger.warning(f"Lesson cache lookup failed: {e}")
+        return None
+    if not cached:
+        return None
+    try:
+        return LessonSummary.model_validate_json(cached)
+    except ValidationError as e:
+        logger.warning(f"Ignoring unreadable cached lesson summary {content_hash}: {e}")
+        return None
+
+
+async def parse_lesson_file(content_hash: str, file_path: Path) -> LessonSummary:
+    """Run the lesson parser, sharing one agent call between concurrent uploads of the same file"""
+    task = _inflight_lesson_parses.get(content_hash)
+    if task is None:
+        async def run_parser() -> LessonSummary:
+            # Ensure path uses forward slashes
+            result = await lesson_parser_agent.run(file_path.as_posix())
+            lesson_summary: LessonSummary = result.output# type: ignore
+            await cache_lesson_summary(content_hash, lesson_summary)
+            return lesson_summary
+
+        task = asyncio.ensure_future(run_parser())
+        _inflight_lesson_parses[content_hash] = task
+        task.add_done_callback(lambda _: _inflight_lesson_parses.pop(content_hash, None))
+    # Shielded so one client disconnecting doesn't cancel the parse for the others
+    return await asyncio.shield(task)
+
+
+async def cache_lesson_summary(content_hash: str, lesson_summary: LessonSummary) -> None:
+    try:
+        await asyncio.to_thread(
+            get_redis().setex,
+            f"{LESSON_CACHE_PREFIX}{content_hash}", LESSON_CACHE_TTL_SECONDS,
+            lesson_summary.model_dump_json()
+        )
+    except Exception as e:
+        logger.warning(f"Lesson cache write failed: {e}")
+
 # ============= TEACHING PACK MANAGEMENT ENDPOINTS =============
 
 
@@ -246,50 +347,84 @@ class DiagnosticResponse(BaseModel):
     diagnostic: Diagnostic
     job_id: str
 
+
+class SkillMapBatchResponse(BaseModel):
+    skill_sets: List[SkillSet]
+    job_id: str
+
+
+class DiagnosticBatchResponse(BaseModel):
+    diagnostics: List[Diagnostic]
+    job_id: str
+
+
+async def run_agent_batch(agent, inputs: List[str]) -> List:
+    """Run an agent over several inputs concurrently, preserving input order"""
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def run_one(prompt: str):
+        async with semaphore:
+            result = await agent.run(prompt)
+            return result.output
+
+    return await asyncio.gather(*(run_one(prompt) for prompt in inputs))
+
+
+# Static API index, encoded once instead of on every load-balancer probe
+ROOT_RESPONSE_BODY = orjson.dumps({
+    "message": "Teaching Pack Generator API",
+    "version": "1.0.0",
+    "docs": "/docs",
+    "endpoints": {
+        "auth": {
+            "login": "POST /api/auth/login",
+            "register": "POST /api/auth/register"
+        },
+        "classrooms": {
+            "list": "GET /api/classrooms",
+            "create": "POST /api/classrooms",
+            "update": "PUT /api/classrooms/{classroom_id}",
+            "delete": "DELETE /api/classrooms/{classroom_id}",
+            "students": "GET /api/classrooms/{classroom_id}/students",
+            "add_student": "POST /api/classrooms/{classroom_id}/students",
+            "lessons": "GET /api/classrooms/{classroom_id}/lessons",
+            "teaching_packs": "GET /api/classrooms/{classroom_id}/teaching-packs"
+        },
+        "students": {
+            "update": "PUT /api/students/{student_id}",
+            "delete": "DELETE /api/students/{student_id}"
+        },
+        "lessons": "GET /api/lessons",
+        "teaching_packs": "GET /api/teaching-packs",
+        "lesson_parse": "POST /api/lesson/parse",
+        "skills_map": "POST /api/skills/map",
+        "skills_map_batch": "POST /api/skills/map/batch",
+        "diagnostic_build": "POST /api/diagnostic/build",
+        "diagnostic_build_batch": "POST /api/diagnostic/build/batch",
+        "lesson_pipeline": "POST /api/lesson/pipeline",
+        "packs_generate": "POST /api/packs/generate",
+        "job_status": "GET /api/jobs/{job_id}"
+    }
+})
+
+
 @app.get("/")
 async def root():
     """Root endpoint with API information"""
-    return {
-        "message": "Teaching Pack Generator API",
-        "version": "1.0.0",
-        "docs": "/docs",
-        "endpoints": {
-            "auth": {
-                "login": "POST /api/auth/login",
-                "register": "POST /api/auth/register"
-            },
-            "classrooms": {
-                "list": "GET /api/classrooms",
-                "create": "POST /api/classrooms",
-                "update": "PUT /api/classrooms/{classroom_id}",
-                "delete": "DELETE /api/classrooms/{classroom_id}",
-                "students": "GET /api/classrooms/{classroom_id}/students",
-                "add_student": "POST /api/classrooms/{classroom_id}/students",
-                "lessons": "GET /api/classrooms/{classroom_id}/lessons",
-                "teaching_packs": "GET /api/classrooms/{classroom_id}/teaching-packs"
-            },
-            "students": {
-                "update": "PUT /api/students/{student_id}",
-                "delete": "DELETE /api/students/{student_id}"
-            },
-            "lessons": "GET /api/lessons",
-            "teaching_packs": "GET /api/teaching-packs",
-            "lesson_parse": "POST /api/lesson/parse",
-            "skills_map": "POST /api/skills/map",
-            "diagnostic_build": "POST /api/diagnostic/build",
-            "packs_generate": "POST /api/packs/generate",
-            "job_status": "GET /api/jobs/{job_id}"
-        }
-    }
+    return Response(content=ROOT_RESPONSE_BODY, media_type="application/json")
+
+
+# The environment is fixed for the life of the process
+HEALTH_RESPONSE_BODY = orjson.dumps({
+    "status": "healthy",
+    "gemini_api_configured": bool(os.getenv("GEMINI_API_KEY"))
+})
 
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "gemini_api_configured": bool(os.getenv("GEMINI_API_KEY"))
-    }
+    return Response(content=HEALTH_RESPONSE_BODY, media_type="application/json")
 
 
 @app.get("/api/test-error")
@@ -342,15 +477,17 @@ async def parse_lesson(
         upload_dir.mkdir(parents=True, exist_ok=True)
         file_path = upload_dir / file.filename# type: ignore
 
-        await save_upload_file(file, file_path)
-        logger.info(f"File saved: {file_path}")
+        content_hash = await save_upload_file(file, file_path)
+        logger.info(f"File saved: {file_path} (sha256={content_hash})")
 
-        # Parse lesson
-        logger.info("Parsing lesson content...")
-        # Ensure path uses forward slashes
-        result = await lesson_parser_agent.run(Path(file_path).as_posix())
-        lesson_summary: LessonSummary = result.output# type: ignore
-        logger.info(f"Lesson parsed: {lesson_summary.title}")
+        # Parse lesson, reusing the summary of an identical earlier upload if cached
+        lesson_summary = await get_cached_lesson_summary(content_hash)
+        if lesson_summary:
+            logger.info(f"Lesson summary cache hit: {lesson_summary.title}")
+        else:
+            logger.info("Parsing lesson content...")
+            lesson_summary = await parse_lesson_file(content_hash, file_path)
+            logger.info(f"Lesson parsed: {lesson_summary.title}")
 
         # Save lesson to database if classroom_id is provided
         if classroom_id:
@@ -442,6 +579,58 @@ async def build_diagnostic(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/skills/map/batch")
+async def map_skills_batch(
+    lesson_summaries: List[LessonSummary],
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Map skills for several lesson summaries at once
+
+    - **lesson_summaries**: Lesson summaries from parse_lesson endpoint
+
+    Returns: One SkillSet per lesson summary, in the same order
+
+    Requires authentication.
+    """
+    try:
+        logger.info(f"Mapping skills for {len(lesson_summaries)} lessons...")
+        skill_sets = await run_agent_batch(
+            skill_mapper_agent, [summary.model_dump_json() for summary in lesson_summaries]
+        )
+        return SkillMapBatchResponse(skill_sets=skill_sets, job_id=str(uuid.uuid4()))
+
+    except Exception as e:
+        logger.error(f"Error mapping skills: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/diagnostic/build/batch")
+async def build_diagnostic_batch(
+    skill_sets: List[SkillSet],
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Build diagnostic assessments for several skill sets at once
+
+    - **skill_sets**: Skill sets from map_skills endpoint
+
+    Returns: One Diagnostic per skill set, in the same order
+
+    Requires authentication.
+    """
+    try:
+        logger.info(f"Building diagnostics for {len(skill_sets)} skill sets...")
+        diagnostics = await run_agent_batch(
+            diagnostic_builder_agent, [skill_set.model_dump_json() for skill_set in skill_sets]
+        )
+        return DiagnosticBatchResponse(diagnostics=diagnostics, job_id=str(uuid.uuid4()))
+
+    except Exception as e:
+        logger.error(f"Error building diagnostics: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 # Import and include routers
 from api.routes import auth, classrooms, students, lessons, grouping, files, jobs, teaching_packs
 
@@ -1,10 +1,16 @@
 import os
+from functools import lru_cache
 from redis import Redis
 from rq import Queue
 
+@lru_cache(maxsize=1)
 def get_redis() -> Redis:
+    # One client per process so enqueues reuse pooled connections instead of
+    # opening a fresh TCP connection per request.
+    # Bounded timeouts so an unreachable Redis fails fast instead of hanging requests
     url = os.getenv("REDIS_URL", "redis://redis:6379/0")
-    return Redis.from_url(url)
+    return Redis.from_url(url, socket_connect_timeout=2, socket_timeout=5)
 
+@lru_cache(maxsize=1)
 def get_queue() -> Queue:
     return Queue("teachingpack", connection=get_redis())
@@ -2,15 +2,27 @@
 File serving routes
 Handles serving output files, videos, and slides
 """
+import os
+from typing import List, Optional, Tuple
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, RedirectResponse
 from pathlib import Path
+from utils.r2_public import r2_public_url, safe_key
 
 router = APIRouter(prefix="/api", tags=["Files"])
 
 # Will be imported from main module
 OUTPUT_DIR = None
 
+# (directory mtime_ns, JSON file names) from the last list_outputs scan
+_outputs_listing: Optional[Tuple[int, List[str]]] = None
+
+OUTPUT_MEDIA_TYPES = {
+    ".json": "application/json",
+    ".html": "text/html",
+    ".pdf": "application/pdf",
+}
+
 
 def set_output_dir(output_dir: Path):
     """Set OUTPUT_DIR from main module"""
@@ -18,6 +30,22 @@ def set_output_dir(output_dir: Path):
     OUTPUT_DIR = output_dir
 
 
+def resolve_local_file(filename: str) -> Optional[Path]:
+    """Return the file under OUTPUT_DIR for filename, or None if it isn't there"""
+    path = (OUTPUT_DIR / filename).resolve()
+    if path.is_file() and path.is_relative_to(OUTPUT_DIR.resolve()):
+        return path
+    return None
+
+
+def r2_redirect(key: str) -> Optional[RedirectResponse]:
+    """Redirect to the public R2 copy of an asset, or None if R2 isn't configured"""
+    try:
+        return RedirectResponse(url=r2_public_url(safe_key(key)), status_code=302)
+    except RuntimeError:
+        return None
+
+
 @router.get("/outputs/{filename}")
 async def get_output_file(filename: str):
     """
@@ -31,21 +59,17 @@ async def get_output_file(filename: str):
     
     file_path = OUTPUT_DIR / filename
     
-    if not file_path.exists():
+    # Single stat, reused by FileResponse instead of statting again
+    try:
+        stat_result = file_path.stat()
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"File {filename} not found")
     
-    media_type = "application/octet-stream"
-    if filename.endswith(".json"):
-        media_type = "application/json"
-    elif filename.endswith(".html"):
-        media_type = "text/html"
-    elif filename.endswith(".pdf"):
-        media_type = "application/pdf"
-    
     return FileResponse(
         path=str(file_path),
         filename=filename,
-        media_type=media_type
+        media_type=OUTPUT_MEDIA_TYPES.get(file_path.suffix, "application/octet-stream"),
+        stat_result=stat_result
     )
 
 
@@ -54,48 +78,65 @@ async def list_outputs():
     """
     List all output files
     """
-    output_files = [f.name for f in OUTPUT_DIR.glob("*.json")]
+    global _outputs_listing
+    # The directory mtime only changes when entries are added, removed or renamed
+    mtime_ns = OUTPUT_DIR.stat().st_mtime_ns
+    if _outputs_listing is None or _outputs_listing[0] != mtime_ns:
+        with os.scandir(OUTPUT_DIR) as entries:
+            names = [entry.name for entry in entries if entry.name.endswith(".json")]
+        _outputs_listing = (mtime_ns, names)
+    output_files = list(_outputs_listing[1])
     return {
         "files": output_files,
         "count": len(output_files)
     }
 
 
-@router.get("/videos/{filename}")
+@router.get("/videos/{filename:path}")
 async def get_video_file(filename: str):
     """
     Serve video files
     
-    - **filename**: Name of the video file
+    - **filename**: Name of the video file, or its R2 key
+
+    Files not present locally are redirected to R2 so the CDN serves the bytes.
     """
-    video_path = OUTPUT_DIR / filename
+    video_path = resolve_local_file(filename)
     
-    if not video_path.exists():
+    if video_path is None:
+        redirect = r2_redirect(filename)
+        if redirect:
+            return redirect
         raise HTTPException(status_code=404, detail=f"Video file {filename} not found")
     
     return FileResponse(
         path=str(video_path),
-        filename=filename,
+        filename=video_path.name,
         media_type="video/mp4"
     )
 
 
-@router.get("/slides/{filename}")
+@router.get("/slides/{filename:path}")
 async def get_slides_file(filename: str):
     """
     Serve slides files
     
-    - **filename**: Name of the slides file
+    - **filename**: Name of the slides file, or its R2 key
+
+    Files not present locally are redirected to R2 so the CDN serves the bytes.
     """
-    slides_path = OUTPUT_DIR / filename
+    slides_path = resolve_local_file(filename)
     
-    if not slides_path.exists():
+    if slides_path is None:
+        redirect = r2_redirect(filename)
+        if redirect:
+            return redirect
         raise HTTPException(status_code=404, detail=f"Slides file {filename} not found")
     
     # Create response with headers optimized for embedding
     response = FileResponse(
         path=str(slides_path),
-        filename=filename,
+        filename=slides_path.name,
         media_type="application/vnd.openxmlformats-officedocument.presentationml.presentation"
     )
     
@@ -103,7 +144,7 @@ async def get_slides_file(filename: str):
     response.headers["Access-Control-Allow-Origin"] = "*"
     response.headers["Access-Control-Allow-Methods"] = "GET, HEAD, OPTIONS"
     response.headers["Access-Control-Allow-Headers"] = "*"
-    response.headers["Content-Disposition"] = f"inline; filename=\"{filename}\""
+    response.headers["Content-Disposition"] = f"inline; filename=\"{slides_path.name}\""
     response.headers["Cache-Control"] = "public, max-age=3600"
     
     return response
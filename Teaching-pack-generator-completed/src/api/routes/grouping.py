@@ -2,14 +2,20 @@
 Student grouping routes
 Handles student list uploads, parsing, and intelligent group creation
 """
+import asyncio
+import shutil
 import uuid
+from functools import lru_cache
 from pathlib import Path
 from fastapi import APIRouter, HTTPException, File, UploadFile, Form
+from fastapi.responses import ORJSONResponse
 from loguru import logger
+from sqlalchemy.orm import load_only
 
-from api.dependencies import CurrentUser, DBSession
+from api.dependencies import DBSession, OwnedClassroom
+from models.database_models import Student
 from models.database_service import (
-    get_classroom_by_id, get_students_by_classroom
+    get_students_by_classroom, replace_classroom_students
 )
 from utils.workflow_helpers import parse_student_list_with_scores
 from utils.basetools.heterogeneous_grouping import ai_grouping_by_subject
@@ -20,26 +26,44 @@ OUTPUT_DIR.mkdir(exist_ok=True)
 
 router = APIRouter(prefix="/api/classrooms/{classroom_id}", tags=["Grouping"])
 
+# Multiple of the 4 KiB page size; fewer write() calls on multi-MB uploads
+UPLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+@lru_cache(maxsize=256)
+def _norm_key(key: str) -> str:
+    """Display form of a group key: 'group_1' -> 'Group 1'"""
+    return key.replace('_', ' ').title()
+
+
+def _pack_group_key(pack: dict):
+    """Group id of a generated pack: pack['group']['group_id'], else group_id/focus"""
+    group = pack.get("group")
+    group_key = group.get("group_id") if isinstance(group, dict) else None
+    return group_key or pack.get("group_id") or pack.get("focus")
+
+
+def _copy_upload(source, destination: Path) -> None:
+    source.seek(0)
+    with destination.open("wb") as f:
+        shutil.copyfileobj(source, f, UPLOAD_CHUNK_SIZE)
+
 
 async def save_upload_file(upload_file: UploadFile, destination: Path) -> Path:
     """Save uploaded file to destination"""
     destination.parent.mkdir(parents=True, exist_ok=True)
-    with destination.open("wb") as f:
-        while True:
-            chunk = await upload_file.read(1024 * 1024)
-            if not chunk:
-                break
-            f.write(chunk)
+    # One worker-thread copy instead of a thread hop per awaited chunk read
+    await asyncio.to_thread(_copy_upload, upload_file.file, destination)
     await upload_file.close()
     return destination
 
 
-@router.post("/upload-students-and-group")
+@router.post("/upload-students-and-group", response_class=ORJSONResponse)
 async def upload_students_and_create_groups(
     classroom_id: int,
     student_list_file: UploadFile = File(...),
     num_groups: int = Form(4),
-    current_user: CurrentUser = ...,
+    classroom: OwnedClassroom = ...,
     db: DBSession = ...
 ):
     """
@@ -54,11 +78,6 @@ async def upload_students_and_create_groups(
     strong students for peer learning.
     """
     try:
-        # Validate classroom ownership
-        classroom = get_classroom_by_id(db, classroom_id)
-        if not classroom or classroom.teacher_id != current_user.id:  # type: ignore
-            raise HTTPException(status_code=404, detail="Classroom not found")
-        
         # Save uploaded file
         upload_id = str(uuid.uuid4())
         upload_dir = OUTPUT_DIR / "uploads" / upload_id
@@ -68,8 +87,8 @@ async def upload_students_and_create_groups(
         await save_upload_file(student_list_file, file_path)
         logger.info(f"Student list file saved: {file_path}")
         
-        # Parse student list with scores
-        students_data = parse_student_list_with_scores(str(file_path))
+        # Parse student list with scores (pandas parse runs off the event loop)
+        students_data, student_id_to_data = await asyncio.to_thread(parse_student_list_with_scores, str(file_path))
         
         if not students_data:
             raise HTTPException(status_code=400, detail="No students found in file")
@@ -83,54 +102,51 @@ async def upload_students_and_create_groups(
         # AI agent returns complete groups_configuration with profiles
         groups_configuration = await ai_grouping_by_subject(students_data, subject, num_groups)  # type: ignore
         
-        # Save or update students in database
-        from models.database_models import Student
-        
-        # Clear existing students in classroom
-        db.query(Student).filter(Student.classroom_id == classroom_id).delete()
-        
-        # Add new students with their group assignments
+        # Save or update students in database with their group assignments
         # groups_configuration structure: {group_id: {group_id, students: [ids], profile: {...}}}
-        student_id_to_data = {s['student_id']: s for s in students_data}
-        
-        for group_id, group_info in groups_configuration.items():
-            student_ids = group_info['students']
-            for student_id in student_ids:
-                if student_id in student_id_to_data:
-                    student_data = student_id_to_data[student_id]
-                    new_student = Student(
-                        student_id=student_data["student_id"],
-                        full_name=student_data["full_name"],
-                        email=student_data.get("email", f"{student_data['student_id']}_{classroom_id}@example.com"),
-                        classroom_id=classroom_id,
-                        subject_scores=student_data.get("subject_scores", {}),
-                        grade_level=student_data.get("grade_level"),
-                        notes=student_data.get("notes"),
-                        group_id=group_id
-                    )
-                    db.add(new_student)
+        assignments = [
+            (group_id, student_id)
+            for group_id, group_info in groups_configuration.items()
+            for student_id in group_info['students']
+        ]
+        student_rows = [
+            {
+                "student_id": student_data["student_id"],
+                "full_name": student_data["full_name"],
+                "email": student_data.get("email", f"{student_data['student_id']}_{classroom_id}@example.com"),
+                "classroom_id": classroom_id,
+                "subject_scores": student_data.get("subject_scores", {}),
+                "grade_level": student_data.get("grade_level"),
+                "notes": student_data.get("notes"),
+                "group_id": group_id
+            }
+            for group_id, student_id in assignments
+            if (student_data := student_id_to_data.get(student_id)) is not None
+        ]
+        replace_classroom_students(db, classroom_id, student_rows)
         
         # Save groups configuration to classroom
         classroom.groups_configuration = groups_configuration  # type: ignore
         classroom.student_count = len(students_data)  # type: ignore
         
+        # Read before commit expires the instance; saves the SELECT db.refresh() issued
+        classroom_info = {
+            "id": classroom.id,
+            "name": classroom.name,
+            "subject": classroom.subject,
+            "grade": classroom.grade
+        }
         db.commit()
-        db.refresh(classroom)
         
         logger.info(f"Successfully created {num_groups} groups for classroom {classroom_id}")
         
-        return {
+        return ORJSONResponse({
             "message": f"Successfully uploaded {len(students_data)} students and created {num_groups} groups",
             "num_students": len(students_data),
             "num_groups": num_groups,
             "groups": groups_configuration,
-            "classroom": {
-                "id": classroom.id,
-                "name": classroom.name,
-                "subject": classroom.subject,
-                "grade": classroom.grade
-            }
-        }
+            "classroom": classroom_info
+        })
         
     except ValueError as ve:
         logger.error(f"Validation error: {str(ve)}")
@@ -141,11 +157,11 @@ async def upload_students_and_create_groups(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/create-groups")
+@router.post("/create-groups", response_class=ORJSONResponse)
 async def create_groups_from_existing_students(
     classroom_id: int,
     num_groups: int = 4,
-    current_user: CurrentUser = ...,
+    classroom: OwnedClassroom = ...,
     db: DBSession = ...
 ):
     """
@@ -159,11 +175,6 @@ async def create_groups_from_existing_students(
     strong students for peer learning, using existing student data.
     """
     try:
-        # Validate classroom ownership
-        classroom = get_classroom_by_id(db, classroom_id)
-        if not classroom or classroom.teacher_id != current_user.id:  # type: ignore
-            raise HTTPException(status_code=404, detail="Classroom not found")
-        
         # Get existing students
         students = get_students_by_classroom(db, classroom_id)
         if not students:
@@ -191,39 +202,36 @@ async def create_groups_from_existing_students(
         groups_configuration = await ai_grouping_by_subject(students_data, subject, num_groups)  # type: ignore
         
         # Update students with their group assignments
-        from models.database_models import Student
-        
+        # One UPDATE per group rather than a SELECT + UPDATE per student
         for group_id, group_info in groups_configuration.items():
             student_ids = group_info['students']
-            for student_id in student_ids:
-                # Find student in database and update group_id
-                student = db.query(Student).filter(
-                    Student.student_id == student_id,
-                    Student.classroom_id == classroom_id
-                ).first()
-                if student:
-                    student.group_id = group_id
+            if student_ids:
+                db.query(Student).filter(
+                    Student.classroom_id == classroom_id,
+                    Student.student_id.in_(student_ids)
+                ).update({Student.group_id: group_id}, synchronize_session=False)
         
         # Save groups configuration to classroom
         classroom.groups_configuration = groups_configuration  # type: ignore
         
+        # Read before commit expires the instance; saves the SELECT db.refresh() issued
+        classroom_info = {
+            "id": classroom.id,
+            "name": classroom.name,
+            "subject": classroom.subject,
+            "grade": classroom.grade
+        }
         db.commit()
-        db.refresh(classroom)
         
         logger.info(f"Successfully created {num_groups} groups for classroom {classroom_id}")
         
-        return {
+        return ORJSONResponse({
             "message": f"Successfully created {num_groups} groups from {len(students_data)} existing students",
             "num_students": len(students_data),
             "num_groups": num_groups,
             "groups": groups_configuration,
-            "classroom": {
-                "id": classroom.id,
-                "name": classroom.name,
-                "subject": classroom.subject,
-                "grade": classroom.grade
-            }
-        }
+            "classroom": classroom_info
+        })
         
     except ValueError as ve:
         logger.error(f"Validation error: {str(ve)}")
@@ -234,156 +242,91 @@ async def create_groups_from_existing_students(
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
-@router.get("/groups")
+@router.get("/groups", response_class=ORJSONResponse)
 async def get_classroom_groups(
     classroom_id: int,
     pack_id: int = None,
-    current_user: CurrentUser = ...,
+    classroom: OwnedClassroom = ...,
     db: DBSession = ...
 ):
     """Get groups configuration for a classroom"""
     from models.database_models import TeachingPack
     
-    classroom = get_classroom_by_id(db, classroom_id)
-    if not classroom or classroom.teacher_id != current_user.id:  # type: ignore
-        raise HTTPException(status_code=404, detail="Classroom not found")
-    
     if not classroom.groups_configuration:  # type: ignore
-        return {
+        return ORJSONResponse({
             "message": "No groups configured yet",
             "groups": {}
-        }
+        })
     
     # Get the groups configuration
     groups_config = classroom.groups_configuration  # type: ignore
     
-    # Enhance groups with data from TeachingPack table
-    teaching_packs = db.query(TeachingPack).filter(
-        TeachingPack.classroom_id == classroom_id
-    ).all()
+    # Enhance groups with data from the specified teaching pack, otherwise the latest one
+    # Only the columns merged below; skips lesson_summary/skill_set/diagnostic JSON
+    pack_query = db.query(TeachingPack).options(load_only(
+        TeachingPack.id, TeachingPack.teaching_pack_data,
+        TeachingPack.video_urls, TeachingPack.slides_urls, TeachingPack.flashcard_urls
+    )).filter(TeachingPack.classroom_id == classroom_id)
+    if pack_id:
+        selected_tp = pack_query.filter(TeachingPack.id == pack_id).first()
+        if not selected_tp:
+            raise HTTPException(status_code=404, detail=f"Teaching pack {pack_id} not found")
+    else:
+        selected_tp = pack_query.order_by(TeachingPack.id.desc()).first()
     
     # First, collect video_urls and slides_urls from their respective fields (per-group storage)
-    # Use urls from the specified pack_id if provided, otherwise latest
     video_urls_map = {}
     slides_urls_map = {}
     flashcard_urls_map = {}
-    if teaching_packs:
-        if pack_id:
-            selected_tp = next((tp for tp in teaching_packs if tp.id == pack_id), None)
-            if not selected_tp:
-                raise HTTPException(status_code=404, detail=f"Teaching pack {pack_id} not found")
-        else:
-            selected_tp = max(teaching_packs, key=lambda tp: tp.id)
-        
+    if selected_tp:
         if selected_tp.video_urls:
             for group_key, video_url in selected_tp.video_urls.items():
                 if video_url:
-                    # Normalize group keys
+                    # Keyed by normalized group key only
                     original_key = str(group_key).replace('pack-' + str(selected_tp.id) + '-', '')
-                    normalized_key = original_key.replace('_', ' ').title()
-                    video_urls_map[original_key] = video_url
-                    video_urls_map[normalized_key] = video_url
-                    logger.info(f"Found video URL for {original_key}: {video_url}")
+                    video_urls_map[_norm_key(original_key)] = video_url
         if selected_tp.slides_urls:
             for group_key, slides_url in selected_tp.slides_urls.items():
                 if slides_url:
-                    # Normalize group keys
+                    # Keyed by normalized group key only
                     original_key = str(group_key).replace('pack-' + str(selected_tp.id) + '-', '')
-                    normalized_key = original_key.replace('_', ' ').title()
-                    slides_urls_map[original_key] = slides_url
-                    slides_urls_map[normalized_key] = slides_url
-                    logger.info(f"Found slides URL for {original_key}: {slides_url}")
+                    slides_urls_map[_norm_key(original_key)] = slides_url
         if selected_tp.flashcard_urls:
             for group_key, fl_url in selected_tp.flashcard_urls.items():
                 if fl_url:
                     original_key = str(group_key).replace('pack-' + str(selected_tp.id) + '-', '')
-                    normalized_key = original_key.replace('_', ' ').title()
-                    flashcard_urls_map[original_key] = fl_url
-                    flashcard_urls_map[normalized_key] = fl_url
-                    logger.info(f"Found flashcard URL for {original_key}: {fl_url}")
+                    flashcard_urls_map[_norm_key(original_key)] = fl_url
     
     # Create a map of pack data by group id/focus
+    packs = []
+    teaching_pack_data = selected_tp.teaching_pack_data if selected_tp else None
+    if teaching_pack_data:
+        logger.debug("Processing teaching pack {}, data keys: {}", selected_tp.id, list(teaching_pack_data))
+        packs = teaching_pack_data.get("teaching_packs")
+        if not isinstance(packs, list):
+            # Fallback to root level matching
+            packs = [teaching_pack_data]
+    
+    # Keyed by normalized group key so 'group_1' and 'Group 1' match; the stable sort
+    # puts packs with a video_url first, so setdefault keeps the first of those per group
+    keyed_packs = [(_norm_key(str(group_key)), pack) for pack in packs if (group_key := _pack_group_key(pack))]
+    keyed_packs.sort(key=lambda item: not item[1].get("video_url"))
     pack_data_map = {}
-    for tp in teaching_packs:
-        if tp.teaching_pack_data:
-            teaching_pack_data = tp.teaching_pack_data
-            logger.info(f"Processing teaching pack {tp.id}, data keys: {list(teaching_pack_data.keys())}")
-            
-            # If there are teaching_packs, find the pack for each group
-            if "teaching_packs" in teaching_pack_data and isinstance(teaching_pack_data["teaching_packs"], list):
-                logger.info(f"Found {len(teaching_pack_data['teaching_packs'])} teaching packs")
-                for idx, pack in enumerate(teaching_pack_data["teaching_packs"]):
-                    group_key = None
-                    if "group" in pack and isinstance(pack["group"], dict):
-                        group_key = pack["group"].get("group_id")
-                    if not group_key:
-                        group_key = pack.get("group_id") or pack.get("focus")
-                    
-                    logger.info(f"Pack {idx}: group_key={group_key}, video_url={pack.get('video_url')}")
-                    
-                    if group_key:
-                        # Store with both original and normalized keys for flexible matching
-                        original_key = str(group_key)
-                        normalized_key = str(group_key).replace('_', ' ').title()  # 'group_1' -> 'Group 1'
-                        
-                        # Only overwrite if this pack has video_url and existing doesn't, or if no existing data
-                        should_update = False
-                        if original_key not in pack_data_map:
-                            should_update = True
-                        elif pack.get('video_url') and not pack_data_map[original_key].get('video_url'):
-                            # Prioritize packs with video_url
-                            should_update = True
-                            logger.info(f"Overwriting {original_key} with pack that has video_url")
-                        
-                        if should_update:
-                            pack_data_map[original_key] = pack
-                            pack_data_map[normalized_key] = pack
-                            logger.info(f"Mapped pack to keys: {original_key}, {normalized_key}")
-            else:
-                # Fallback to root level matching
-                group_key = None
-                if "group" in teaching_pack_data and isinstance(teaching_pack_data["group"], dict):
-                    group_key = teaching_pack_data["group"].get("group_id")
-                if not group_key:
-                    group_key = teaching_pack_data.get("group_id") or teaching_pack_data.get("focus")
-                if group_key:
-                    original_key = str(group_key)
-                    normalized_key = str(group_key).replace('_', ' ').title()
-                    
-                    # Only overwrite if this pack has video_url and existing doesn't, or if no existing data
-                    should_update = False
-                    if original_key not in pack_data_map:
-                        should_update = True
-                    elif teaching_pack_data.get('video_url') and not pack_data_map[original_key].get('video_url'):
-                        should_update = True
-                        logger.info(f"Overwriting {original_key} with root pack that has video_url")
-                    
-                    if should_update:
-                        pack_data_map[original_key] = teaching_pack_data
-                        pack_data_map[normalized_key] = teaching_pack_data
+    for normalized_key, pack in keyed_packs:
+        pack_data_map.setdefault(normalized_key, pack)
     
     # Merge pack data into groups configuration
-    logger.info(f"Pack data map keys: {list(pack_data_map.keys())}")
-    logger.info(f"Groups config keys: {list(groups_config.keys()) if isinstance(groups_config, dict) else 'Not a dict'}")
+    logger.debug("Pack data map keys: {}, groups config keys: {}", list(pack_data_map), list(groups_config) if isinstance(groups_config, dict) else "Not a dict")
     
     if isinstance(groups_config, dict):
         for group_key, group_data in groups_config.items():
+            normalized_group_key = _norm_key(str(group_key))  # 'group_1' -> 'Group 1'
+            
             # Add group_id and group_name to each group
             group_data["group_id"] = group_key
-            group_data["group_name"] = str(group_key).replace('_', ' ').title()  # 'group_1' -> 'Group 1'
+            group_data["group_name"] = normalized_group_key
             
-            logger.info(f"Processing group: {group_key}")
-            
-            # Try to find pack data with both original and normalized keys
-            pack_data = None
-            if group_key in pack_data_map:
-                pack_data = pack_data_map[group_key]
-                logger.info(f"Found pack data for {group_key} using original key")
-            else:
-                normalized_group_key = str(group_key).replace('_', ' ').title()
-                if normalized_group_key in pack_data_map:
-                    pack_data = pack_data_map[normalized_group_key]
-                    logger.info(f"Found pack data for {group_key} using normalized key {normalized_group_key}")
+            pack_data = pack_data_map.get(normalized_group_key)
             
             if pack_data:
                 group_data.update({
@@ -406,39 +349,20 @@ async def get_classroom_groups(
                     "video_thumbnail": None
                 })
             
-            # Override with video URL from video_urls field if available (higher priority)
-            if group_key in video_urls_map:
-                group_data["video_url"] = video_urls_map[group_key]
-                logger.info(f"Overriding video_url for {group_key} from video_urls field: {video_urls_map[group_key]}")
-            elif str(group_key).replace('_', ' ').title() in video_urls_map:
-                normalized_key = str(group_key).replace('_', ' ').title()
-                group_data["video_url"] = video_urls_map[normalized_key]
-                logger.info(f"Overriding video_url for {group_key} from video_urls field (normalized): {video_urls_map[normalized_key]}")
-            
-            # Override with slides URL from slides_urls field if available (higher priority)
-            if group_key in slides_urls_map:
-                group_data["slides_url"] = slides_urls_map[group_key]
-                logger.info(f"Overriding slides_url for {group_key} from slides_urls field: {slides_urls_map[group_key]}")
-            elif str(group_key).replace('_', ' ').title() in slides_urls_map:
-                normalized_key = str(group_key).replace('_', ' ').title()
-                group_data["slides_url"] = slides_urls_map[normalized_key]
-                logger.info(f"Overriding slides_url for {group_key} from slides_urls field (normalized): {slides_urls_map[normalized_key]}")
-            
-            # Override with flashcard URL from flashcard_urls field if available (higher priority)
-            if group_key in flashcard_urls_map:
-                group_data["flashcard_url"] = flashcard_urls_map[group_key]
-                logger.info(f"Overriding flashcard_url for {group_key} from flashcard_urls field: {flashcard_urls_map[group_key]}")
-            elif str(group_key).replace('_', ' ').title() in flashcard_urls_map:
-                normalized_key = str(group_key).replace('_', ' ').title()
-                group_data["flashcard_url"] = flashcard_urls_map[normalized_key]
-                logger.info(f"Overriding flashcard_url for {group_key} from flashcard_urls field (normalized): {flashcard_urls_map[normalized_key]}")
+            # Override with URLs from the per-group url fields if available (higher priority)
+            for field, urls_map in (
+                ("video_url", video_urls_map),
+                ("slides_url", slides_urls_map),
+                ("flashcard_url", flashcard_urls_map),
+            ):
+                url = urls_map.get(normalized_group_key)
+                if url:
+                    group_data[field] = url
             
-            logger.info(f"Final video_url for {group_key}: {group_data.get('video_url')}")
-            logger.info(f"Final slides_url for {group_key}: {group_data.get('slides_url')}")
-            logger.info(f"Final flashcard_url for {group_key}: {group_data.get('flashcard_url')}")
+            logger.debug("Group {} urls: video={}, slides={}, flashcard={}", group_key, group_data.get("video_url"), group_data.get("slides_url"), group_data.get("flashcard_url"))
     
-    return {
+    return ORJSONResponse({
         "classroom_id": classroom_id,
         "num_groups": len(groups_config) if isinstance(groups_config, dict) else 0,  # type: ignore
         "groups": groups_config
-    }
+    })
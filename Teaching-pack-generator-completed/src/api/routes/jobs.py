@@ -3,8 +3,12 @@ Job status routes
 Handles async job status monitoring
 """
 from datetime import datetime, timedelta, timezone
+from types import MappingProxyType
+from cachetools import TTLCache
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
+from sqlalchemy import or_
+from sqlalchemy.orm import defer
 from typing import Optional, Dict
 from models.database_models import WorkflowJob
 from api.dependencies import CurrentUser, DBSession
@@ -14,6 +18,28 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/jobs", tags=["Jobs"])
 
+# Worker-side job statuses mapped onto the four states clients understand
+STATUS_MAP = MappingProxyType({
+    "pending": "queued",
+    "completed_with_errors": "completed"
+})
+VALID_STATUSES = frozenset(("queued", "processing", "completed", "failed"))
+FINISHED_STATUSES = frozenset(("completed", "failed"))
+STALE_TIMEOUT = timedelta(minutes=30)
+
+# Polling clients hit the same job every second or so. The cache is per API process:
+# the RQ worker and other web workers (WEB_CONCURRENCY > 1) also rewrite job rows,
+# including finished jobs when their packs are committed, and cannot invalidate it.
+# Every status, finished or not, is therefore cached for only about a second;
+# invalidate_job_status drops this process's copy right after it writes a row.
+# Entries are (created_by_id, JobStatus) keyed by job id.
+_job_status_cache: TTLCache = TTLCache(maxsize=4096, ttl=1.0)
+
+
+def invalidate_job_status(job_id: str) -> None:
+    """Drop this process's cached status of a job whose row was just rewritten"""
+    _job_status_cache.pop(job_id, None)
+
 
 class JobStatus(BaseModel):
     job_id: str
@@ -41,33 +67,40 @@ async def get_job_status(
     
     Requires authentication.
     """
-    job = db.query(WorkflowJob).filter(WorkflowJob.id == job_id).first()
+    cached = _job_status_cache.get(job_id)
+    if cached is not None:
+        owner_id, cached_status = cached
+        if owner_id and owner_id != current_user.id:
+            raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+        return cached_status
+
+    # result_json can be large and is only written once the job finishes
+    # Ownership is part of the lookup: jobs without an owner are visible to everyone
+    job = db.query(WorkflowJob).options(defer(WorkflowJob.result_json)).filter(
+        WorkflowJob.id == job_id,
+        or_(WorkflowJob.created_by_id.is_(None), WorkflowJob.created_by_id == current_user.id)
+    ).first()
     if not job:
         raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
-    if job.created_by_id and job.created_by_id != current_user.id:  # type: ignore
-        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
 
     raw_status = (job.status or "queued").lower()
-    status_map = {
-        "pending": "queued",
-        "completed_with_errors": "completed"
-    }
-    normalized_status = status_map.get(raw_status, raw_status)
-    if normalized_status not in {"queued", "processing", "completed", "failed"}:
+    normalized_status = STATUS_MAP.get(raw_status, raw_status)
+    if normalized_status not in VALID_STATUSES:
         normalized_status = "queued"
+    result_json = job.result_json if normalized_status in FINISHED_STATUSES else None
 
     stale_message = None
     if normalized_status == "processing" and job.updated_at:
         updated_at = job.updated_at  # type: ignore
         if updated_at.tzinfo is None:
             updated_at = updated_at.replace(tzinfo=timezone.utc)
-        if datetime.now(timezone.utc) - updated_at > timedelta(minutes=30):
+        if datetime.now(timezone.utc) - updated_at > STALE_TIMEOUT:
             normalized_status = "failed"
             stale_message = "Job appears stale (worker may have restarted). Please retry."
 
     errors = []
-    if isinstance(job.result_json, dict):  # type: ignore
-        errors = job.result_json.get("errors") or []  # type: ignore
+    if isinstance(result_json, dict):
+        errors = result_json.get("errors") or []
     has_errors = isinstance(errors, list) and len(errors) > 0
     error_count = len(errors) if has_errors else 0
 
@@ -75,13 +108,15 @@ async def get_job_status(
     if stale_message:
         message = stale_message if not message else f"{message} {stale_message}"
 
-    return JobStatus(
+    job_status = JobStatus(
         job_id=str(job.id),
         status=normalized_status,
         progress=job.progress or 0.0,  # type: ignore
         has_errors=has_errors,
         error_count=error_count,
         message=message,  # type: ignore
-        result=job.result_json if normalized_status == "completed" else None,  # type: ignore
+        result=result_json if normalized_status == "completed" else None,  # type: ignore
         error=message if normalized_status == "failed" else None  # type: ignore
     )
+    _job_status_cache[job_id] = (job.created_by_id, job_status)
+    return job_status
@@ -3,22 +3,25 @@ Lesson management routes
 Handles lesson upload and retrieval
 """
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import ORJSONResponse
 from api.dependencies import CurrentUser, DBSession
 from models.database_models import Lesson, UserRole
 from models.database_service import get_lessons_by_classroom
 from api.main import flashcard_agent, theory_question_agent
 from utils.workflow_helpers import load_lesson_content
+from sqlalchemy.orm import selectinload
 from sqlalchemy.orm.attributes import flag_modified
+import hashlib
 import logging
 import os
 import tempfile
-import uuid
+from functools import lru_cache
 from pathlib import Path
 from utils.r2_storage import download_r2_to_path
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/lessons", tags=["Lessons"])
+router = APIRouter(prefix="/api/lessons", tags=["Lessons"], default_response_class=ORJSONResponse)
 
 
 def resolve_lesson_file_path(file_path: str) -> str:
@@ -29,8 +32,12 @@ def resolve_lesson_file_path(file_path: str) -> str:
     lower_path = file_path.lower()
     if not lower_path.endswith((".pdf", ".txt")):
         return file_path
-    tmp_dir = tempfile.gettempdir()
-    tmp_path = os.path.join(tmp_dir, f"lesson_{uuid.uuid4().hex}_{Path(file_path).name}")
+    # Named after the R2 key so repeat generations (and other workers) reuse one download;
+    # download_file writes to a temp name and renames, so a present file is complete
+    key_hash = hashlib.sha1(file_path.encode()).hexdigest()
+    tmp_path = os.path.join(tempfile.gettempdir(), f"lesson_{key_hash}_{Path(file_path).name}")
+    if os.path.isfile(tmp_path) and os.path.getsize(tmp_path) > 0:
+        return tmp_path
     try:
         download_r2_to_path(file_path, tmp_path)
         return tmp_path
@@ -39,11 +46,24 @@ def resolve_lesson_file_path(file_path: str) -> str:
         return ""
 
 
+@lru_cache(maxsize=32)
+def _load_lesson_content_cached(file_path: str, mtime: float) -> str:
+    return load_lesson_content(file_path)
+
+
+def read_lesson_content(file_path: str) -> str:
+    """load_lesson_content, memoized until the file's mtime changes"""
+    if not file_path or not os.path.isfile(file_path):
+        # Unresolved paths keep load_lesson_content's own fallback behaviour
+        return load_lesson_content(file_path)
+    return _load_lesson_content_cached(file_path, os.path.getmtime(file_path))
+
+
 @router.get("")
 async def get_user_lessons(current_user: CurrentUser, db: DBSession):
     """Get all lessons uploaded by the current user"""
-    lessons = db.query(Lesson).filter(Lesson.uploaded_by_id == current_user.id).all()  # type: ignore
-    return [
+    lessons = db.query(Lesson).options(selectinload(Lesson.classroom)).filter(Lesson.uploaded_by_id == current_user.id).all()  # type: ignore
+    return ORJSONResponse([
         {
             "id": l.id,
             "title": l.title,
@@ -58,14 +78,14 @@ async def get_user_lessons(current_user: CurrentUser, db: DBSession):
             } if l.classroom else None
         }
         for l in lessons
-    ]
+    ])
 
 
 @router.get("/classrooms/{classroom_id}")
 async def get_classroom_lessons(classroom_id: int, current_user: CurrentUser, db: DBSession):
     """Get all lessons in a classroom"""
     lessons = get_lessons_by_classroom(db, classroom_id)
-    return [
+    return ORJSONResponse([
         {
             "id": l.id,
             "title": l.title,
@@ -81,7 +101,7 @@ async def get_classroom_lessons(classroom_id: int, current_user: CurrentUser, db
             } if l.uploaded_by else None
         }
         for l in lessons
-    ]
+    ])
 
 
 @router.post("/{lesson_id}/flashcards")
@@ -99,7 +119,7 @@ async def generate_flashcards(lesson_id: int, current_user: CurrentUser, db: DBS
     # Load content
     try:
         resolved_path = resolve_lesson_file_path(lesson.file_path)
-        content = load_lesson_content(resolved_path)
+        content = read_lesson_content(resolved_path)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to load lesson content: {str(e)}")
 
@@ -218,7 +238,7 @@ Generate a "General" group AND the specific groups found in Grouping Information
         logger.exception("AI Agent failed for flashcards")
         raise HTTPException(status_code=500, detail=f"Failed to generate flashcards: {str(e)}")
     
-    return lesson.flashcards or {"groups": []}
+    return ORJSONResponse(lesson.flashcards or {"groups": []})
 
 
 @router.get("/{lesson_id}/flashcards")
@@ -254,7 +274,7 @@ async def get_flashcards(lesson_id: int, current_user: CurrentUser, db: DBSessio
     # Legacy migration: if stored as old FlashcardSet {flashcards: [], group_flashcards: ...}
     if isinstance(data, dict):
         if "groups" in data:
-            return data
+            return ORJSONResponse(data)
         
         # Construct groups from old format
         groups = []
@@ -300,7 +320,7 @@ async def generate_theory_questions(lesson_id: int, current_user: CurrentUser, d
         # Load content
         try:
             resolved_path = resolve_lesson_file_path(lesson.file_path)
-            content = load_lesson_content(resolved_path)
+            content = read_lesson_content(resolved_path)
         except Exception as e:
             logger.error(f"Failed to load lesson content: {e}")
             raise HTTPException(status_code=500, detail=f"Failed to load lesson content: {str(e)}")
@@ -425,7 +445,7 @@ Each group must have 6-12 questions.
             logger.exception("AI Agent failed")
             raise HTTPException(status_code=500, detail=f"Failed to generate questions: {str(e)}")
         
-        return lesson.theory_questions or {"groups": []}
+        return ORJSONResponse(lesson.theory_questions or {"groups": []})
 
     except HTTPException:
         raise
@@ -482,4 +502,4 @@ async def get_theory_questions(lesson_id: int, current_user: CurrentUser, db: DB
     if "groups" not in data:
         return {"groups": []}
 
-    return data
+    return ORJSONResponse(data)
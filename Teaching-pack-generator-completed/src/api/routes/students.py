@@ -3,12 +3,13 @@ Student management routes
 Handles student CRUD operations
 """
 from fastapi import APIRouter, HTTPException, Form
+from fastapi.responses import ORJSONResponse
 from api.dependencies import CurrentUser, DBSession
 from models.database_service import (
     get_student_by_id, update_student, delete_student
 )
 
-router = APIRouter(prefix="/api/students", tags=["Students"])
+router = APIRouter(prefix="/api/students", tags=["Students"], default_response_class=ORJSONResponse)
 
 
 @router.put("/{student_id}")
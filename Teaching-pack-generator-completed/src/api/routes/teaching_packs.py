@@ -6,10 +6,10 @@ import asyncio
 import os
 import uuid
 import json
-import requests
 import tempfile
+import httpx
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from pathlib import Path
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends
 from fastapi.responses import FileResponse
@@ -22,6 +22,7 @@ from api.dependencies import CurrentUser, DBSession
 from api.auth import get_current_active_user
 from models.database import get_db
 from api.queue import get_queue
+from api.routes.jobs import invalidate_job_status
 from utils.r2_storage import upload_bytes_to_r2, upload_fileobj_to_r2, download_r2_to_path
 from utils.r2_public import r2_public_url, safe_key
 
@@ -33,7 +34,7 @@ from api.main import flashcard_agent, flashcard_group_agent
 
 # Import database services
 from models.database_service import (
-    get_classroom_by_id, get_students_by_classroom, create_lesson,
+    get_classroom_by_id, get_students_by_classroom, create_lesson, create_lessons_bulk,
     create_teaching_pack, update_teaching_pack_status
 )
 
@@ -85,6 +86,9 @@ from api.main import (
 # Create router with prefix
 router = APIRouter(prefix="/api", tags=["teaching-packs"])
 
+# Max lessons processed at once by a lesson pipeline job
+LESSON_PIPELINE_CONCURRENCY = 8
+
 
 # ============= REQUEST/RESPONSE MODELS =============
 
@@ -157,6 +161,15 @@ class CommitAllPacksRequest(BaseModel):
     job_id: str
 
 
+class LessonPipelineResult(BaseModel):
+    filename: str
+    lesson_id: Optional[int] = None
+    lesson_summary: Optional[LessonSummary] = None
+    skill_set: Optional[SkillSet] = None
+    diagnostic: Optional[Diagnostic] = None
+    error: Optional[str] = None
+
+
 # ============= HELPER FUNCTIONS =============
 
 async def save_upload_file(upload_file: UploadFile, destination: Path) -> Path:
@@ -181,6 +194,7 @@ def upsert_workflow_job(db, job_id: str, **fields) -> WorkflowJob:
         for key, value in fields.items():
             setattr(job_record, key, value)
     db.commit()
+    invalidate_job_status(job_id)
     return job_record
 
 
@@ -264,6 +278,127 @@ def run_process_asset_generation(
             loop.close()
 
 
+def run_process_lesson_pipeline(
+    job_id: str,
+    lesson_file_paths: List[str],
+    user_id: Optional[int] = None,
+    classroom_id: Optional[int] = None,
+) -> None:
+    try:
+        asyncio.run(process_lesson_pipeline(job_id, lesson_file_paths, user_id, classroom_id))
+    except RuntimeError:
+        loop = asyncio.new_event_loop()
+        try:
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(
+                process_lesson_pipeline(job_id, lesson_file_paths, user_id, classroom_id)
+            )
+        finally:
+            loop.close()
+
+
+def pipeline_upload_key(job_id: str, index: int, filename: str) -> str:
+    """R2 key for the index-th file of a lesson pipeline upload; the index keeps same-named files apart"""
+    return f"uploads/{job_id}/{index}_{filename}"
+
+
+def pipeline_upload_filename(r2_key: str) -> str:
+    """Original filename of a key built by pipeline_upload_key"""
+    return Path(r2_key).name.split("_", 1)[1]
+
+
+async def process_lesson_pipeline(
+    job_id: str,
+    lesson_file_paths: List[str],
+    user_id: Optional[int] = None,
+    classroom_id: Optional[int] = None
+):
+    """Parse, map skills and build a diagnostic for each lesson concurrently"""
+    from models.database import SessionLocal
+
+    semaphore = asyncio.Semaphore(LESSON_PIPELINE_CONCURRENCY)
+    tmp_dir = tempfile.gettempdir()
+
+    async def process(r2_key: str) -> LessonPipelineResult:
+        filename = pipeline_upload_filename(r2_key)
+        async with semaphore:
+            # Key basename carries the upload index, so same-named files get their own temp copy
+            tmp_path = os.path.join(tmp_dir, f"{job_id}_{Path(r2_key).name}")
+            try:
+                await asyncio.to_thread(download_r2_to_path, r2_key, tmp_path)
+                result = await lesson_parser_agent.run(Path(tmp_path).as_posix())
+                lesson_summary: LessonSummary = result.output  # type: ignore
+            finally:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+            result = await skill_mapper_agent.run(lesson_summary.model_dump_json())
+            skill_set: SkillSet = result.output  # type: ignore
+            result = await diagnostic_builder_agent.run(skill_set.model_dump_json())
+            diagnostic: Diagnostic = result.output  # type: ignore
+        return LessonPipelineResult(
+            filename=filename,
+            lesson_summary=lesson_summary,
+            skill_set=skill_set,
+            diagnostic=diagnostic
+        )
+
+    db = SessionLocal()
+    try:
+        upsert_workflow_job(db, job_id, status="processing", progress=0.01, message="Processing")
+
+        # One failed LLM call is reported on its lesson instead of failing the batch
+        outcomes = await asyncio.gather(
+            *(process(key) for key in lesson_file_paths), return_exceptions=True
+        )
+        parsed = []
+        errors = []
+        for r2_key, outcome in zip(lesson_file_paths, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.error(f"Lesson pipeline failed for {r2_key}: {outcome}")
+                errors.append(f"{pipeline_upload_filename(r2_key)}: {outcome}")
+                outcome = LessonPipelineResult(filename=pipeline_upload_filename(r2_key), error=str(outcome))
+            parsed.append((r2_key, outcome))
+
+        # Save all parsed lessons to the classroom with a single bulk insert
+        if classroom_id and user_id:
+            saved = [(r2_key, item) for r2_key, item in parsed if item.lesson_summary]
+            lesson_ids = create_lessons_bulk(db, [
+                {
+                    "title": item.lesson_summary.title,
+                    "subject": item.lesson_summary.subject,
+                    "grade": item.lesson_summary.grade,
+                    "classroom_id": classroom_id,
+                    "uploaded_by_id": user_id,
+                    "original_filename": item.filename,
+                    "file_path": r2_key,
+                    "parsed_content": item.lesson_summary.model_dump(mode="json"),
+                }
+                for r2_key, item in saved
+            ])
+            for (_, item), lesson_id in zip(saved, lesson_ids):
+                item.lesson_id = lesson_id
+
+        lessons = [item.model_dump(mode="json") for _, item in parsed]
+
+        upsert_workflow_job(
+            db,
+            job_id,
+            status="completed_with_errors" if errors else "completed",
+            progress=1.0,
+            message=f"Processed {len(lessons)} lessons",
+            result_json={"lessons": lessons, "errors": errors}
+        )
+        logger.info(f"Lesson pipeline job {job_id} completed with {len(errors)} errors")
+    except Exception as e:
+        logger.error(f"Lesson pipeline job {job_id} failed: {str(e)}")
+        try:
+            upsert_workflow_job(db, job_id, status="failed", progress=1.0, message=str(e))
+        except Exception as db_e:
+            logger.error(f"Failed to save failed WorkflowJob to DB: {db_e}")
+    finally:
+        db.close()
+
+
 async def process_full_workflow(
     lesson_file_path: str,
     num_groups: int,
@@ -474,6 +609,9 @@ async def process_full_workflow(
         
         # Stage 7: Generate teaching packs (with error recovery for each pack)
         teaching_packs = []
+        # Already-validated models shared by every group; dump them once
+        lesson_summary_dict = lesson_summary.model_dump()
+        skill_set_dict = skill_set.model_dump()
         for group in labeled_groups:
             pack_data = {
                 "group": group.model_dump(),
@@ -488,18 +626,19 @@ async def process_full_workflow(
                 logger.info(f"Planning pack for {group.group_name}...")
                 context = {
                     "group": group.model_dump(),
-                    "lesson_summary": lesson_summary.model_dump(),
-                    "skill_set": skill_set.model_dump()
+                    "lesson_summary": lesson_summary_dict,
+                    "skill_set": skill_set_dict
                 }
                 result = await pack_planner_agent.run(str(context))
                 pack_plan: PackPlan = result.output# type: ignore
                 pack_data["pack_plan"] = pack_plan.model_dump()
+                pack_plan_json = pack_plan.model_dump_json()
                 logger.info(f"Pack planned with {len(pack_plan.slide_outline)} slides")
                 
                 # Generate quiz and practice questions
                 try:
                     logger.info(f"Generating quiz for {group.group_name}...")
-                    result = await quiz_practice_agent.run(pack_plan.model_dump_json())
+                    result = await quiz_practice_agent.run(pack_plan_json)
                     quiz_data = result.output# type: ignore
                     pack_data["quiz"] = quiz_data.model_dump() if hasattr(quiz_data, 'model_dump') else quiz_data  # type: ignore
                     logger.info(f"Quiz generated with {len(quiz_data.questions) if hasattr(quiz_data, 'questions') else 'unknown'} questions")  # type: ignore
@@ -540,7 +679,7 @@ async def process_full_workflow(
                 # Draft video script and visuals
                 try:
                     logger.info(f"Drafting video script for {group.group_name}...")
-                    agent_result = await video_drafter_agent.run(pack_plan.model_dump_json())
+                    agent_result = await video_drafter_agent.run(pack_plan_json)
                     video_data = agent_result.output.model_dump() if hasattr(agent_result.output, 'model_dump') else agent_result.output  # type: ignore
 
                     if isinstance(video_data, str):
@@ -783,7 +922,8 @@ async def process_asset_generation(
                 if download_url:
                     # Download the file and save it locally
                     try:
-                        response = requests.get(download_url)
+                        async with httpx.AsyncClient(timeout=60, follow_redirects=True) as client:
+                            response = await client.get(download_url)
                         response.raise_for_status()
                         
                         # Generate unique filename
@@ -1139,6 +1279,7 @@ async def commit_all_teaching_packs(
             job_record.result_json = full_data
             flag_modified(job_record, "result_json")
             db.commit()
+            invalidate_job_status(request.job_id)
         
         logger.info(f"Committed all teaching packs as single record (ID: {teaching_pack.id})")
         return {"teaching_pack_id": teaching_pack.id, "status": "committed"}
@@ -1233,6 +1374,7 @@ async def commit_teaching_pack(
             job_record.result_json = full_data
             flag_modified(job_record, "result_json")
             db.commit()
+            invalidate_job_status(request.job_id)
             
         # Update JSON file with new ID (Legacy support - Try but ignore errors)
         if output_path and output_path.exists():
@@ -1622,6 +1764,76 @@ async def generate_teaching_packs(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/lesson/pipeline")
+async def run_lesson_pipeline(
+    current_user: CurrentUser,
+    db: DBSession,
+    files: List[UploadFile] = File(...),
+    classroom_id: Optional[int] = Form(None)
+):
+    """
+    Parse, map skills and build a diagnostic for several lessons at once
+
+    - **files**: Lesson files (PDF or TXT format)
+    - **classroom_id**: Optional classroom ID to save the parsed lessons to
+
+    Returns: Job ID to track processing status. The completed job's result
+    holds one entry per lesson with its summary, skill set and diagnostic.
+
+    Requires authentication.
+    """
+    for file in files:
+        if not file.filename.endswith(('.pdf', '.txt')):  # type: ignore
+            raise HTTPException(status_code=400, detail=f"Only PDF and TXT files are supported: {file.filename}")
+
+    if classroom_id:
+        classroom = get_classroom_by_id(db, classroom_id)
+        if not classroom or classroom.teacher_id != current_user.id:  # type: ignore
+            raise HTTPException(status_code=404, detail="Classroom not found")
+
+    try:
+        job_id = str(uuid.uuid4())
+        r2_keys = []
+        for index, file in enumerate(files):
+            r2_key = pipeline_upload_key(job_id, index, file.filename)  # type: ignore
+            file.file.seek(0)
+            upload_fileobj_to_r2(
+                file.file, r2_key, content_type=file.content_type or "application/pdf"
+            )
+            await file.close()
+            r2_keys.append(r2_key)
+
+        upsert_workflow_job(
+            db,
+            job_id,
+            status="queued",
+            progress=0.0,
+            message="Queued for processing",
+            created_by_id=current_user.id  # type: ignore
+        )
+
+        q = get_queue()
+        q.enqueue(
+            run_process_lesson_pipeline,
+            job_id,
+            r2_keys,
+            current_user.id,  # type: ignore
+            classroom_id,
+            job_timeout=30 * 60,
+            job_id=job_id
+        )
+
+        return {
+            "job_id": job_id,
+            "status": "queued",
+            "message": "Lesson pipeline started. Use /api/jobs/{job_id} to check status."
+        }
+
+    except Exception as e:
+        logger.error(f"Error starting lesson pipeline: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.put("/teaching-packs/{teaching_pack_id}/video-url")
 async def save_video_url(
     teaching_pack_id: int,
@@ -1,4 +1,5 @@
 from pydantic_ai import Agent
+from pydantic_ai.settings import ModelSettings
 from typing import List, Callable, Optional, Type, TypeVar, cast
 from pydantic_ai.models.google import GoogleModel
 from pydantic_ai.providers.google import GoogleProvider
@@ -14,11 +15,13 @@ T = TypeVar('T')
 
 class AgentClient:
     def __init__(
-        self, system_prompt: str, tools: List[Callable], model: GoogleModel = model
+        self, system_prompt: str, tools: List[Callable], model: GoogleModel = model,
+        model_settings: Optional[ModelSettings] = None
     ):
         self.model = model
         self.system_prompt = system_prompt
         self.tools = tools
+        self.model_settings = model_settings
 
     def create_agent(self, result_type: Optional[Type[T]] = None):
         """Creates and returns a PydanticAI Agent instance."""
@@ -28,7 +31,11 @@ class AgentClient:
                 model=self.model, 
                 system_prompt=self.system_prompt, 
                 tools=self.tools,
-                output_type=result_type  # type: ignore
+                output_type=result_type,  # type: ignore
+                model_settings=self.model_settings
             )
             return agent
-        return Agent(model=self.model, system_prompt=self.system_prompt, tools=self.tools)
+        return Agent(
+            model=self.model, system_prompt=self.system_prompt, tools=self.tools,
+            model_settings=self.model_settings
+        )
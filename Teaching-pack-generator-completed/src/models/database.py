@@ -27,11 +27,11 @@ else:
 
 print(f"DEBUG: Using Database URL: {DATABASE_URL}")
 
-# Create engine
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-)
+# Create engine; SQLite keeps its default pool, server databases get a larger one
+if DATABASE_URL.startswith("sqlite"):
+    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+else:
+    engine = create_engine(DATABASE_URL, pool_size=20, max_overflow=10, pool_recycle=1800)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -3,7 +3,7 @@
 SQLAlchemy database models for Teaching Pack Generator
 """
 import enum
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Float, Boolean, JSON, Enum
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Float, Boolean, JSON, Enum, UniqueConstraint
 from sqlalchemy.orm import declarative_base, relationship
 from sqlalchemy.sql import func
 
@@ -54,6 +54,9 @@ class Classroom(Base):
 
 class Student(Base):
     __tablename__ = "students"
+    __table_args__ = (
+        UniqueConstraint("classroom_id", "student_id", name="uq_students_classroom_student"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(String(50), nullable=False)
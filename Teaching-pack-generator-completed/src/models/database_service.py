@@ -1,8 +1,9 @@
 """
 Database service functions for CRUD operations
 """
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import and_, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from typing import List, Optional
 from loguru import logger
 from .database_models import (
@@ -91,6 +92,32 @@ def create_student(db: Session, student_id: str, full_name: str, email: str, cla
     db.refresh(student)
     return student
 
+STUDENT_UPSERT_COLUMNS = (
+    "full_name", "email", "subject_scores", "grade_level", "notes", "group_id"
+)
+
+def replace_classroom_students(db: Session, classroom_id: int, rows: List[dict]) -> None:
+    """
+    Make the classroom's students exactly `rows`, in the current transaction; the caller commits.
+    PostgreSQL upserts on (classroom_id, student_id) and drops students no longer listed,
+    everything else clears the classroom and does one bulk INSERT.
+    """
+    if db.get_bind().dialect.name == "postgresql" and rows:
+        stmt = pg_insert(Student).values(rows)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[Student.classroom_id, Student.student_id],
+            set_={column: stmt.excluded[column] for column in STUDENT_UPSERT_COLUMNS}
+        ))
+        db.query(Student).filter(
+            Student.classroom_id == classroom_id,
+            Student.student_id.notin_([row["student_id"] for row in rows])
+        ).delete(synchronize_session=False)
+    else:
+        db.query(Student).filter(Student.classroom_id == classroom_id).delete(synchronize_session=False)
+        if rows:
+            db.bulk_insert_mappings(Student, rows)
+    logger.info(f"Students replaced in Classroom {classroom_id}: {len(rows)}")
+
 def get_student_by_id(db: Session, student_id: int) -> Optional[Student]:
     return db.query(Student).filter(Student.id == student_id).first()
 
@@ -146,8 +173,18 @@ def create_lesson(db: Session, title: str, subject: str, grade: str, classroom_i
     db.refresh(lesson)
     return lesson
 
+def create_lessons_bulk(db: Session, rows: List[dict]) -> List[int]:
+    """Insert several lessons in one executemany round-trip and return their IDs in row order"""
+    if not rows:
+        return []
+    lesson_ids = list(db.scalars(insert(Lesson).returning(Lesson.id, sort_by_parameter_order=True), rows))
+    db.commit()
+    logger.info(f"Lessons created: {len(lesson_ids)}")
+    return lesson_ids
+
 def get_lessons_by_classroom(db: Session, classroom_id: int) -> List[Lesson]:
-    return db.query(Lesson).filter(Lesson.classroom_id == classroom_id).all()
+    # Uploaders are listed with each lesson; one IN query instead of a lazy load per row
+    return db.query(Lesson).options(selectinload(Lesson.uploaded_by)).filter(Lesson.classroom_id == classroom_id).all()
 
 # Teaching Pack operations
 def create_teaching_pack(db: Session, title: str, classroom_id: int | None, lesson_id: int,
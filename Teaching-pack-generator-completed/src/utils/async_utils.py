@@ -0,0 +1,16 @@
+"""
+Asyncio helpers shared by the experiment scripts
+"""
+import asyncio
+from typing import Any, Iterable, List
+
+
+async def gather_bounded(coros: Iterable[Any], limit: int) -> List[Any]:
+    """Run coroutines concurrently, at most ``limit`` at a time, preserving order."""
+    sem = asyncio.Semaphore(max(1, limit))
+
+    async def _run(coro: Any) -> Any:
+        async with sem:
+            return await coro
+
+    return await asyncio.gather(*(_run(coro) for coro in coros))
@@ -2,6 +2,10 @@
 PDF Parser Tool
 Extracts text content from PDF files with OCR support
 """
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 import PyPDF2
 from typing import Optional, Literal
 import pytesseract
@@ -68,6 +72,45 @@ def extract_text_from_pdf(
     return text.strip()
 
 
+# Created on first use so forked server workers don't inherit a running pool
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+    return _process_pool
+
+
+async def extract_text_from_pdf_async(
+    pdf_path: str,
+    max_pages: Optional[int] = None,
+    use_ocr: bool = False,
+    lang: str = 'vie+eng'
+) -> str:
+    """
+    Extract text content from a PDF file with optional OCR support
+
+    Runs extract_text_from_pdf in a worker process so parsing and OCR
+    don't block the event loop or contend for the GIL.
+
+    Args:
+        pdf_path: Path to PDF file
+        max_pages: Maximum number of pages to extract (None = all pages)
+        use_ocr: If True, use OCR for image-based PDFs (requires pytesseract and pdf2image)
+        lang: OCR language(s), default 'vie+eng' for Vietnamese and English
+
+    Returns:
+        Extracted text content
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_process_pool(),
+        partial(extract_text_from_pdf, pdf_path, max_pages, use_ocr, lang)
+    )
+
+
 def extract_text_with_ocr(image_path: str, lang: str = 'vie+eng') -> str:
     """
     Extract text from an image file using OCR
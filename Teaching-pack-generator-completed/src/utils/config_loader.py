@@ -1,22 +1,91 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import os
+from copy import deepcopy
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, Iterable, Optional
 
 import yaml
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    _YamlLoader = yaml.CSafeLoader
+except AttributeError:  # PyYAML built without libyaml
+    _YamlLoader = yaml.SafeLoader
+
+_SIDECAR_SUFFIX = '.cache.json'
+
+
+def _read_sidecar(path: Path) -> Any:
+    raw = path.read_bytes()
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def _write_sidecar(config_path: Path, sidecar: Path, data: Any) -> None:
+    """Atomically write the parsed config next to the YAML and drop stale sidecars."""
+    payload = json.dumps(data, ensure_ascii=False)
+    if json.loads(payload) != data:
+        # Non-string keys would come back as strings; keep parsing the YAML.
+        return
+    tmp = sidecar.with_name(f'{sidecar.name}.{os.getpid()}.tmp')
+    tmp.write_text(payload, encoding='utf-8')
+    os.replace(tmp, sidecar)
+    for stale in config_path.parent.glob(f'{config_path.name}.*{_SIDECAR_SUFFIX}'):
+        if stale != sidecar:
+            stale.unlink(missing_ok=True)
+
+
+def _parse_config_file(path: str) -> Any:
+    """Parse YAML, or load the JSON sidecar written for identical content.
+
+    The YAML file stays the source of truth: the sidecar name embeds a hash of
+    its bytes, so any edit produces a new sidecar and the old one is pruned.
+    """
+    config_path = Path(path)
+    raw = config_path.read_bytes()
+    digest = hashlib.blake2b(raw, digest_size=8).hexdigest()
+    sidecar = config_path.with_name(f'{config_path.name}.{digest}{_SIDECAR_SUFFIX}')
+    try:
+        return _read_sidecar(sidecar)
+    except (OSError, ValueError):
+        pass
+    data = yaml.load(raw, Loader=_YamlLoader)
+    try:
+        _write_sidecar(config_path, sidecar, data)
+    except (OSError, TypeError, ValueError):
+        # Read-only config dir or YAML-only types (dates): YAML still works.
+        pass
+    return data
+
+
+@lru_cache(maxsize=100)
+def _load_config_cached(path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    # mtime_ns/size are part of the cache key only; an edited file misses.
+    data = _parse_config_file(path) or {}
+    if not isinstance(data, dict):
+        return {}
+    return data
+
 
 def load_config(path: Optional[str]) -> Dict[str, Any]:
     if not path:
         return {}
     config_path = Path(path)
-    if not config_path.exists():
+    try:
+        st = config_path.stat()
+    except OSError:
         return {}
-    with config_path.open('r', encoding='utf-8') as f:
-        data = yaml.safe_load(f) or {}
-    if not isinstance(data, dict):
+    if not config_path.is_file():
         return {}
-    return data
+    # Callers may mutate the result, so never hand out the cached dict itself.
+    return deepcopy(_load_config_cached(os.path.abspath(config_path), st.st_mtime_ns, st.st_size))
 
 
 def get_config_value(config: Dict[str, Any], keys: Iterable[str], default: Any = None) -> Any:
@@ -2,27 +2,36 @@ from __future__ import annotations
 
 import os
 import random
+import sys
 from typing import Optional
 
 
 def set_seed(seed: Optional[int]) -> None:
+    """Seed Python's RNG, plus numpy/torch if the process has already loaded them.
+
+    numpy and torch are not imported here: a cold ``import torch`` costs
+    seconds, and Gemini/vLLM-only runs never touch either RNG. Import them
+    before calling this if later code depends on their seeded state.
+    """
     if seed is None:
         return
     os.environ['PYTHONHASHSEED'] = str(seed)
     random.seed(seed)
 
-    try:
-        import numpy as np
-        np.random.seed(seed)
-    except Exception:
-        pass
+    np = sys.modules.get("numpy")
+    if np is not None:
+        try:
+            np.random.seed(seed)
+        except Exception:
+            pass
 
-    try:
-        import torch
-        torch.manual_seed(seed)
-        if torch.cuda.is_available():
-            torch.cuda.manual_seed_all(seed)
-        torch.backends.cudnn.deterministic = True
-        torch.backends.cudnn.benchmark = False
-    except Exception:
-        pass
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        try:
+            torch.manual_seed(seed)
+            if torch.cuda.is_available():
+                torch.cuda.manual_seed_all(seed)
+            torch.backends.cudnn.deterministic = True
+            torch.backends.cudnn.benchmark = False
+        except Exception:
+            pass
@@ -35,7 +35,7 @@ def load_lesson_content(file_path: str) -> str:
         return file_path
 
 
-def parse_student_list_with_scores(file_path: str) -> List[Dict]:
+def parse_student_list_with_scores(file_path: str) -> Tuple[List[Dict], Dict[str, Dict]]:
     """
     Parse student list WITH SCORES from various file formats
     Expected columns: Name/Student, Toan, Van, Anh, etc.
@@ -44,7 +44,9 @@ def parse_student_list_with_scores(file_path: str) -> List[Dict]:
         file_path: Path to student list file
     
     Returns:
-        List of student dicts: [{"student_id": "...", "full_name": "...", "subject_scores": {"Toan": 8.5, ...}}]
+        Tuple of (students, students by student_id), built in one pass:
+        ([{"student_id": "...", "full_name": "...", "subject_scores": {"Toan": 8.5, ...}}], {"...": {...}})
+        Duplicate student_ids keep the first row.
     
     Raises:
         ValueError: If file format is not supported or parsing fails
@@ -58,7 +60,8 @@ def parse_student_list_with_scores(file_path: str) -> List[Dict]:
             if file_ext == '.csv':
                 df = pd.read_csv(file_path)
             else:
-                df = pd.read_excel(file_path)
+                # Rust calamine reader is much faster than openpyxl for large sheets
+                df = pd.read_excel(file_path, engine="calamine")
             
             # Find student name column
             name_col = None
@@ -103,7 +106,8 @@ def parse_student_list_with_scores(file_path: str) -> List[Dict]:
             
             # Parse students
             students_dict = {}
-            for idx, row in df.iterrows():
+            # Plain dict rows avoid building a Series per row as iterrows() does
+            for row in df.to_dict("records"):
                 student_name = str(row[name_col]).strip()
                 if not student_name or student_name.lower() == 'nan':
                     continue
@@ -139,28 +143,33 @@ def parse_student_list_with_scores(file_path: str) -> List[Dict]:
             
             students = list(students_dict.values())
             logger.info(f"Loaded {len(students)} students with scores from file")
-            return students
+            return students, students_dict
         
         # JSON files
         elif file_ext == '.json':
             with open(file_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
             
-            students = []
+            students_dict = {}
             if isinstance(data, list):
                 for item in data:
                     if isinstance(item, dict):
-                        students.append({
-                            "student_id": item.get("student_id", item.get("id", item.get("name", ""))),
+                        student_id = item.get("student_id", item.get("id", item.get("name", "")))
+                        if student_id in students_dict:
+                            logger.warning(f"Duplicate student_id {student_id}, skipping")
+                            continue
+                        students_dict[student_id] = {
+                            "student_id": student_id,
                             "full_name": item.get("full_name", item.get("name", "")),
                             "subject_scores": item.get("subject_scores", item.get("scores", {})),
                             "grade_level": item.get("grade_level"),
                             "notes": item.get("notes"),
                             "email": item.get("email")  # Only use email if explicitly provided
-                        })
+                        }
             
+            students = list(students_dict.values())
             logger.info(f"Loaded {len(students)} students from JSON file")
-            return students
+            return students, students_dict
         
         else:
             raise ValueError(f"Unsupported file format: {file_ext}. For scores, use Excel or CSV.")